@@ -1,12 +1,17 @@
 from app.core.logging_config import logger
-from fastapi import HTTPException, Depends, status, APIRouter
+import asyncio
+import math
+import time
+from fastapi import HTTPException, Depends, status, APIRouter, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db
+from app.database import get_db, get_read_db
 from fastapi.security import OAuth2PasswordRequestForm
 from app.core.auth import create_access_token
+from app.core.metrics import auth_throttled_total, auth_unknown_user_total
+from app.core.throttle import ip_limiter, username_limiter, verify_latency
 from app.crud.user import get_user_by_username
 from datetime import timedelta
-from app.utils import verify_password
+from app.utils import verify_password, run_in_hash_pool, hash_pool_saturated, HashPoolSaturated
 from app.crud import user
 from app import schemas
 from app.config import ACCESS_TOKEN_EXPIRE_MINUTES
@@ -15,27 +20,67 @@ from app.config import ACCESS_TOKEN_EXPIRE_MINUTES
 auth_router = APIRouter()
 
 
+def too_many_requests(endpoint: str, reason: str, retry_after: float):
+    auth_throttled_total.inc(endpoint, reason)
+    logger.warning("Throttled %s request (%s), retry after %.1fs", endpoint, reason, retry_after)
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests",
+        headers={"Retry-After": str(math.ceil(retry_after))}
+    )
+
+
+def throttle(endpoint: str, request: Request, username: str):
+    # The IP bucket is checked first so a blocked client does not drain the victim username's bucket
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = ip_limiter.acquire((endpoint, client_ip))
+    if retry_after:
+        too_many_requests(endpoint, "ip", retry_after)
+    retry_after = username_limiter.acquire((endpoint, username.lower()))
+    if retry_after:
+        too_many_requests(endpoint, "username", retry_after)
+    # Checked before the user lookup so known and unknown usernames are refused alike
+    if hash_pool_saturated():
+        too_many_requests(endpoint, "hash_capacity", 1)
+
+
 @auth_router.post("/auth/login")
-async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
-    logger.info(f"Login attempt for username: {form_data.username}")
+async def login_user(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_read_db)):
+    logger.info("Login attempt for username: %s", form_data.username)
+    throttle("login", request, form_data.username)
     existing_user = await get_user_by_username(db, form_data.username)
-    if not existing_user or not verify_password(form_data.password, existing_user.hashed_password):
-        logger.warning(f"Login failed for username: {form_data.username}")
+    # Hand the pooled connection back before bcrypt runs
+    await db.close()
+    if not existing_user:
+        # No bcrypt for unknown usernames, but the answer takes as long as a real verify
+        auth_unknown_user_total.inc()
+        await asyncio.sleep(verify_latency.value)
+        logger.warning("Login failed for username: %s", form_data.username)
+        raise HTTPException(status_code=401, detail="Incorrect username or password")
+
+    started = time.perf_counter()
+    try:
+        verified = await run_in_hash_pool(verify_password, form_data.password, existing_user.hashed_password)
+    except HashPoolSaturated:
+        too_many_requests("login", "hash_capacity", 1)
+    verify_latency.observe(time.perf_counter() - started)
+    if not verified:
+        logger.warning("Login failed for username: %s", form_data.username)
         raise HTTPException(status_code=401, detail="Incorrect username or password")
 
     access_token = create_access_token(data={"sub": existing_user.username}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    logger.info(f"Login successful for username: {existing_user.username}")
+    logger.info("Login successful for username: %s", existing_user.username)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @auth_router.post("/auth/register", status_code=status.HTTP_201_CREATED)
-async def register_user(user_data: schemas.User, db: AsyncSession = Depends(get_db)):
-    logger.info(f"Registration attempt for username: {user_data.username}")
-    existing_user = await get_user_by_username(db, user_data.username)
-    if existing_user:
-        logger.warning(f"Registration failed: username {user_data.username} already exists")
-        raise HTTPException(status_code=400, detail="Username already exists")
-
-    await user.create_user(db, user_data.username, user_data.password)
-    logger.info(f"User {user_data.username} registered successfully")
-    return {"message": "User registered successfully!"}
\ No newline at end of file
+async def register_user(request: Request, user_data: schemas.User, db: AsyncSession = Depends(get_db)):
+    logger.info("Registration attempt for username: %s", user_data.username)
+    throttle("register", request, user_data.username)
+    # create_user rejects a taken username before hashing and again on the unique index
+    try:
+        await user.create_user(db, user_data.username, user_data.password)
+    except HashPoolSaturated:
+        too_many_requests("register", "hash_capacity", 1)
+    logger.info("User %s registered successfully", user_data.username)
+    return {"message": "User registered successfully!"}
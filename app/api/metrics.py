@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Response
+from app.core.metrics import registry
+from app.core.cache import principal_cache, task_list_cache
+from app.core.write_queue import task_write_queue
+from app.core.changes import task_changes
+from app.archive import task_archiver
+from app.core.throttle import ip_limiter, username_limiter
+from app.utils import hash_pool_stats
+
+
+metrics_router = APIRouter()
+
+
+def collect_component_stats():
+    return [
+        ("password_hash_pool", "Password hashing pool counters (hash_pool_stats).", hash_pool_stats, "stat"),
+        ("principal_cache", "Authenticated principal cache counters.", principal_cache.stats(), "stat"),
+        ("task_list_cache", "Task list response cache counters.", task_list_cache.stats(), "stat"),
+        ("task_write_queue", "Group commit queue counters.", task_write_queue.stats(), "stat"),
+        ("task_changes", "Change feed waiters and write notifications.", task_changes.stats(), "stat"),
+        ("task_archiver", "Closed task archival counters.", task_archiver.stats(), "stat"),
+        ("auth_ip_limiter", "Auth token buckets keyed by client IP.", ip_limiter.stats(), "stat"),
+        ("auth_username_limiter", "Auth token buckets keyed by username.", username_limiter.stats(), "stat"),
+    ]
+
+
+registry.add_collector(collect_component_stats)
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
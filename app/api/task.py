@@ -1,65 +1,411 @@
-from app.core.logging_config import logger
-from fastapi import HTTPException, Depends, status, APIRouter
+import asyncio
+from app.core.logging_config import logger, request_logger
+from fastapi import HTTPException, Depends, status, APIRouter, Response, Body, Query, Request, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db
+from fastapi.responses import StreamingResponse
+from typing import Any, Literal
+from operator import attrgetter
+from pydantic import TypeAdapter, ValidationError
+from datetime import datetime
+from app.database import get_db, get_read_db, AsyncSessionReadLocal
 from app import schemas
 from app.crud import task
+from app.models.task import TaskStatus
 from app.core.auth import get_current_user
-from app.config import TASKS_FETCH_LIMIT
+from app.config import TASKS_FETCH_LIMIT, TASKS_LOOKUP_MAX_IDS, TASKS_SEARCH_LIMIT, TASK_SERIALIZER, TASKS_EXPORT_BATCH_SIZE, TASKS_IMPORT_BATCH_SIZE, TASKS_IMPORT_MAX_REPORTED_ERRORS, TASKS_BULK_MAX_ITEMS
+from app.config import TASKS_CHANGES_LIMIT, TASKS_CHANGES_MAX_WAIT_SECONDS, TASKS_CHANGES_POLL_INTERVAL_SECONDS
+from app.config import TASKS_CHANGES_SSE_HEARTBEAT_SECONDS, TASKS_CHANGES_SSE_MAX_SECONDS, TASKS_CHANGES_SSE_RETRY_MS
+from app.export import ndjson_chunks, csv_chunks, gzip_chunks
+from app.importer import import_tasks
+from app.serialization import dump_tasks, dump_task_rows, dump_task_changes, dump_payload, negotiate_media_type, JSON
+from app.search import build_match_query, InvalidSearchQuery
+from app.pagination import encode_cursor, decode_cursor, InvalidCursor
+from app.core.etag import task_etag, collection_etag, etag_matches
+from app.core import cache
+from app.core.changes import task_changes
 
 
 task_router = APIRouter()
+TASK_ID = TypeAdapter(int)
 
 
 def handle_task_not_found(task_id: int):
-    logger.error(f"Task with ID={task_id} not found")
+    logger.error("Task with ID=%s not found", task_id)
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
         detail=f"Task with ID {task_id} not found"
     )
 
 
+def not_modified(etag: str, headers: dict | None = None):
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, **(headers or {})})
+
+
+def parse_cursor(after: str, sort: str, order: str) -> tuple[int, object]:
+    try:
+        payload = decode_cursor(after)
+        # A cursor only makes sense for the ordering it was issued for
+        if payload.get("sort", "id") != sort or payload.get("order", "asc") != order:
+            raise InvalidCursor(after)
+        value = payload.get("value")
+        if sort in ("created_at", "updated_at"):
+            value = datetime.fromisoformat(value)
+        elif sort == "title" and not isinstance(value, str):
+            raise InvalidCursor(after)
+        return payload["id"], value
+    except (InvalidCursor, TypeError, ValueError):
+        logger.error("Invalid pagination cursor: %s", after)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def next_cursor(db_task, sort: str, order: str) -> str:
+    payload = {"id": db_task.id}
+    if sort != "id":
+        value = getattr(db_task, sort)
+        payload.update(sort=sort, order=order, value=value.isoformat() if isinstance(value, datetime) else value)
+    elif order != "asc":
+        payload["order"] = order
+    return encode_cursor(payload)
+
+
+def parse_task_ids(ids: str) -> list[int]:
+    try:
+        task_ids = [int(task_id) for task_id in ids.split(",") if task_id.strip()]
+    except ValueError:
+        logger.error("Invalid task ids: %s", ids)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be a comma-separated list of integers")
+    if not task_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must not be empty")
+    return task_ids
+
+
+async def lookup_response(db: AsyncSession, task_ids: list[int], accept: str | None):
+    if len(task_ids) > TASKS_LOOKUP_MAX_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {TASKS_LOOKUP_MAX_IDS} ids per lookup")
+    db_tasks = await task.lookup_tasks(db, task_ids)
+    results = bulk_results(db_tasks, task_ids, "found")
+    media_type = negotiate_media_type(accept)
+    body = dump_payload([result.model_dump(mode="json") for result in results], media_type)
+    return Response(content=body, media_type=media_type, headers={"Vary": "Accept"})
+
+
+def reject_mixed_lookup(request: Request, if_none_match: str | None):
+    # A lookup is not a page: list parameters and conditional requests do not apply to it
+    mixed = sorted(set(request.query_params) - {"ids"})
+    if mixed or if_none_match is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"ids cannot be combined with {', '.join(mixed) or 'If-None-Match'}")
+
+
 @task_router.get("/tasks", response_model=list[schemas.TaskResponse])
-async def get_all_tasks(skip: int = 0, limit: int = TASKS_FETCH_LIMIT, db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    logger.info(f"Fetching tasks with skip={skip} and limit={limit}, current user is {current_user.username}")
-    tasks = await task.get_tasks(db, skip=skip, limit=limit)
-    logger.info(f"Found {len(tasks)} tasks")
-    return tasks
+async def get_all_tasks(
+    request: Request,
+    ids: str | None = Query(None, description="Comma-separated task ids. Returns the same per-id results as GET /tasks/lookup instead of a page, and cannot be combined with the other parameters."),
+    skip: int = 0,
+    limit: int = TASKS_FETCH_LIMIT,
+    after: str | None = None,
+    task_status: TaskStatus | None = Query(None, alias="status"),
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    updated_after: datetime | None = None,
+    sort: schemas.TaskSortField = "id",
+    order: schemas.SortOrder = "asc",
+    if_none_match: str | None = Header(None),
+    accept: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    if ids is not None:
+        request_logger.info("Looking up tasks by ids, current user is %s", current_user.username)
+        reject_mixed_lookup(request, if_none_match)
+        return await lookup_response(db, parse_task_ids(ids), accept)
+    request_logger.info("Fetching tasks with skip=%s, after=%s and limit=%s, current user is %s", skip, after, limit, current_user.username)
+    if after is not None and skip:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either skip or after, not both")
+    after_id, after_value = parse_cursor(after, sort, order) if after is not None else (None, None)
+    filters = {"status": task_status, "created_after": created_after, "created_before": created_before, "updated_after": updated_after}
+
+    # The version is read before querying, so a page fetched while a write commits is filed under the old version
+    query_parts = (skip, after, limit, sort, order, *filters.values())
+    media_type = negotiate_media_type(accept)
+    cache_key = (cache.task_table_version, media_type, *query_parts)
+    cached = cache.task_list_cache.get(cache_key)
+    if cached is None:
+        fast = TASK_SERIALIZER == "fast"
+        tasks = await task.get_tasks(db, skip=skip, limit=limit, after_id=after_id, after_value=after_value, sort=sort, order=order, as_rows=fast, **filters)
+        headers = {"ETag": collection_etag(tasks, *query_parts, media_type=media_type), "Vary": "Accept"}
+        if tasks and len(tasks) == limit:
+            headers["X-Next-Cursor"] = next_cursor(tasks[-1], sort, order)
+        cached = (dump_task_rows(tasks, media_type) if fast else dump_tasks(tasks, media_type), headers)
+        cache.task_list_cache.set(cache_key, cached)
+        request_logger.info("Found %s tasks", len(tasks))
+
+    body, headers = cached
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers["ETag"], headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def parse_search_cursor(after: str) -> tuple[int, float]:
+    try:
+        payload = decode_cursor(after)
+        return payload["id"], float(payload["score"])
+    except (InvalidCursor, KeyError, TypeError, ValueError):
+        logger.error("Invalid search cursor: %s", after)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+@task_router.get("/tasks/search", response_model=list[schemas.TaskSearchResult])
+async def search_tasks(response: Response, q: str = Query(..., min_length=1), limit: int = Query(TASKS_SEARCH_LIMIT, ge=1, le=TASKS_FETCH_LIMIT), after: str | None = None, accept: str | None = Header(None), db: AsyncSession = Depends(get_read_db), current_user: dict = Depends(get_current_user)):
+    request_logger.info("Searching tasks for q=%s with after=%s and limit=%s, current user is %s", q, after, limit, current_user.username)
+    try:
+        match = build_match_query(q)
+    except InvalidSearchQuery:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Search query has no searchable terms")
+    after_id, after_score = parse_search_cursor(after) if after is not None else (None, None)
+
+    hits = await task.search_tasks(db, match, limit=limit, after_id=after_id, after_score=after_score)
+    headers = {"Vary": "Accept"}
+    if hits and len(hits) == limit:
+        headers["X-Next-Cursor"] = encode_cursor({"id": hits[-1].Task.id, "score": hits[-1].score})
+    request_logger.info("Search matched %s tasks", len(hits))
+    results = [
+        schemas.TaskSearchResult(
+            **schemas.TaskResponse.model_validate(db_task).model_dump(),
+            score=score,
+            title_highlight=title_highlight,
+            snippet=snippet
+        )
+        for db_task, score, title_highlight, snippet in hits
+    ]
+    media_type = negotiate_media_type(accept)
+    if media_type != JSON:
+        body = dump_payload([result.model_dump(mode="json") for result in results], media_type)
+        return Response(content=body, media_type=media_type, headers=headers)
+    response.headers.update(headers)
+    return results
+
+
+async def read_task_changes(since: int, limit: int):
+    # A session per read, so waiting clients hold neither a pooled connection nor an open read snapshot
+    async with AsyncSessionReadLocal() as db:
+        return await task.get_task_changes(db, since, limit)
+
+
+def revision_ahead(since: int):
+    logger.warning("Change feed requested from revision %s, which is ahead of the database", since)
+    raise HTTPException(status_code=status.HTTP_410_GONE, detail="Revision is ahead of the change feed, resync from 0")
+
+
+async def task_change_events(since: int, limit: int):
+    loop = asyncio.get_running_loop()
+    closes_at = loop.time() + TASKS_CHANGES_SSE_MAX_SECONDS
+    last_sent = loop.time()
+    yield b"retry: %d\n\n" % TASKS_CHANGES_SSE_RETRY_MS
+    while loop.time() < closes_at:
+        # Shielded, so a client disconnecting mid-read lets the read finish and return its connection cleanly
+        revision, rows, deleted = await asyncio.shield(read_task_changes(since, limit))
+        if revision < since:
+            yield b"event: resync\ndata: {}\n\n"
+            return
+        since = revision
+        if rows or deleted:
+            # The event id is the revision, so a reconnecting EventSource resumes through Last-Event-ID
+            yield b"id: %d\nevent: changes\ndata: %b\n\n" % (revision, dump_task_changes(revision, rows, deleted))
+            last_sent = loop.time()
+            continue
+        if loop.time() - last_sent >= TASKS_CHANGES_SSE_HEARTBEAT_SECONDS:
+            yield b": keep-alive\n\n"
+            last_sent = loop.time()
+        await task_changes.wait(TASKS_CHANGES_POLL_INTERVAL_SECONDS)
+    request_logger.info("Closing change stream at revision %s", since)
+
+
+@task_router.get("/tasks/changes", response_model=schemas.TaskChanges)
+async def get_task_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(TASKS_CHANGES_LIMIT, ge=1, le=TASKS_CHANGES_LIMIT),
+    wait: float = Query(0, ge=0, le=TASKS_CHANGES_MAX_WAIT_SECONDS),
+    accept: str | None = Header(None),
+    last_event_id: int | None = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    request_logger.info("Fetching task changes since=%s with limit=%s and wait=%s, current user is %s", since, limit, wait, current_user.username)
+    if accept is not None and "text/event-stream" in accept:
+        since = since if last_event_id is None else last_event_id
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        return StreamingResponse(task_change_events(since, limit), media_type="text/event-stream", headers=headers)
+
+    # Long poll: answer as soon as there is something newer than since, or with an empty page once wait runs out
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while True:
+        revision, rows, deleted = await read_task_changes(since, limit)
+        if revision < since:
+            revision_ahead(since)
+        remaining = deadline - loop.time()
+        if rows or deleted or remaining <= 0:
+            break
+        await task_changes.wait(min(remaining, TASKS_CHANGES_POLL_INTERVAL_SECONDS))
+    request_logger.info("Returning %s changed and %s deleted tasks up to revision %s", len(rows), len(deleted), revision)
+    media_type = negotiate_media_type(accept)
+    return Response(content=dump_task_changes(revision, rows, deleted, media_type), media_type=media_type, headers={"Vary": "Accept"})
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def export_body(export_format: str, compress: bool):
+    # The session lives inside the generator so it stays open for the whole streamed response
+    async with AsyncSessionReadLocal() as db:
+        rows = task.stream_task_rows(db, batch_size=TASKS_EXPORT_BATCH_SIZE)
+        chunks = ndjson_chunks(rows, TASKS_EXPORT_BATCH_SIZE) if export_format == "ndjson" else csv_chunks(rows, TASKS_EXPORT_BATCH_SIZE)
+        if compress:
+            chunks = gzip_chunks(chunks)
+        async for chunk in chunks:
+            yield chunk
+    request_logger.info("Finished streaming %s export", export_format)
+
+
+@task_router.get("/tasks/export")
+async def export_tasks(export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"), gzip: bool = False, current_user: dict = Depends(get_current_user)):
+    request_logger.info("Exporting tasks as %s (gzip=%s), current user is %s", export_format, gzip, current_user.username)
+    headers = {"Content-Disposition": f"attachment; filename=tasks.{export_format}"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(export_body(export_format, gzip), media_type=EXPORT_MEDIA_TYPES[export_format], headers=headers)
+
+
+@task_router.post("/tasks/import", response_model=schemas.TaskImportSummary)
+async def import_tasks_file(request: Request, import_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"), batch_size: int = Query(TASKS_IMPORT_BATCH_SIZE, ge=1, le=10000), db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    request_logger.info("Importing %s tasks in batches of %s, current user is %s", import_format, batch_size, current_user.username)
+    # The body is consumed chunk by chunk, so uploads of any size never sit in memory
+    return await import_tasks(db, request.stream(), import_format, batch_size, TASKS_IMPORT_MAX_REPORTED_ERRORS)
+
+
+def validate_bulk_items(items: list, validate) -> tuple[dict[int, object], dict[int, ValidationError]]:
+    if len(items) > TASKS_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {TASKS_BULK_MAX_ITEMS} items per bulk request")
+    # Items are validated one by one, so an invalid item is reported in its own result instead of failing the batch
+    valid, invalid = {}, {}
+    for index, item in enumerate(items):
+        try:
+            valid[index] = validate(item)
+        except ValidationError as e:
+            invalid[index] = e
+    if invalid:
+        request_logger.info("Rejected %s invalid bulk items", len(invalid))
+    return valid, invalid
+
+
+def bulk_results(db_tasks: list, task_ids: list[int], found_status: str, indexes=None, invalid: dict | None = None):
+    results = [
+        schemas.TaskBulkResult(
+            index=index,
+            id=task_id,
+            status=found_status if db_task is not None else "not_found",
+            task=db_task
+        )
+        for index, task_id, db_task in zip(indexes or range(len(task_ids)), task_ids, db_tasks)
+    ]
+    results += [schemas.TaskBulkResult(index=index, status="invalid", detail=str(error)) for index, error in (invalid or {}).items()]
+    return sorted(results, key=attrgetter("index"))
+
+
+@task_router.post("/tasks/bulk", response_model=list[schemas.TaskBulkResult], status_code=status.HTTP_201_CREATED)
+async def create_tasks_bulk(items: list[Any] = Body(...), db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    request_logger.info("Bulk creating %s tasks, current user is %s", len(items), current_user.username)
+    new_tasks, invalid = validate_bulk_items(items, schemas.TaskCreate.model_validate)
+    db_tasks = await task.create_tasks(db, list(new_tasks.values()))
+    return bulk_results(db_tasks, [db_task.id for db_task in db_tasks], "created", list(new_tasks), invalid)
+
+
+@task_router.put("/tasks/bulk", response_model=list[schemas.TaskBulkResult])
+async def update_tasks_bulk(items: list[Any] = Body(...), db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    request_logger.info("Bulk updating %s tasks, current user is %s", len(items), current_user.username)
+    new_tasks, invalid = validate_bulk_items(items, schemas.TaskBulkUpdate.model_validate)
+    db_tasks = await task.update_tasks(db, list(new_tasks.values())) if new_tasks else []
+    return bulk_results(db_tasks, [new_task.id for new_task in new_tasks.values()], "updated", list(new_tasks), invalid)
+
+
+@task_router.delete("/tasks/bulk", response_model=list[schemas.TaskBulkResult])
+async def delete_tasks_bulk(items: list[Any] = Body(...), db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    request_logger.info("Bulk deleting %s tasks, current user is %s", len(items), current_user.username)
+    task_ids, invalid = validate_bulk_items(items, TASK_ID.validate_python)
+    db_tasks = await task.delete_tasks(db, list(task_ids.values())) if task_ids else []
+    return bulk_results(db_tasks, list(task_ids.values()), "deleted", list(task_ids), invalid)
+
+
+@task_router.get("/tasks/lookup", response_model=list[schemas.TaskBulkResult])
+async def lookup_tasks_by_query(ids: str, accept: str | None = Header(None), db: AsyncSession = Depends(get_read_db), current_user: dict = Depends(get_current_user)):
+    request_logger.info("Looking up tasks by ids, current user is %s", current_user.username)
+    return await lookup_response(db, parse_task_ids(ids), accept)
+
+
+@task_router.post("/tasks/lookup", response_model=list[schemas.TaskBulkResult])
+async def lookup_tasks(task_ids: list[int] = Body(..., min_length=1), accept: str | None = Header(None), db: AsyncSession = Depends(get_read_db), current_user: dict = Depends(get_current_user)):
+    request_logger.info("Looking up %s tasks, current user is %s", len(task_ids), current_user.username)
+    return await lookup_response(db, task_ids, accept)
 
 
 @task_router.get("/tasks/{task_id}", response_model=schemas.TaskResponse)
-async def get_task(task_id: int, db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    logger.info(f"Fetching tasks with ID={task_id}, current user is {current_user.username}")
+async def get_task(task_id: int, response: Response, if_none_match: str | None = Header(None), accept: str | None = Header(None), db: AsyncSession = Depends(get_read_db), current_user: dict = Depends(get_current_user)):
+    request_logger.info("Fetching tasks with ID=%s, current user is %s", task_id, current_user.username)
     task_one = await task.get_task(db, task_id)
+    if task_one is None:
+        # Old closed tasks live in the archive; they stay readable but no longer show up in lists
+        task_one = await task.get_archived_task(db, task_id)
     if task_one is None:
         handle_task_not_found(task_id)
-    logger.info(f"Task with ID={task_id} found")
+    media_type = negotiate_media_type(accept)
+    etag = task_etag(task_one, media_type)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, {"Vary": "Accept"})
+    request_logger.info("Task with ID=%s found", task_id)
+    if media_type != JSON:
+        body = dump_payload(schemas.TaskResponse.model_validate(task_one).model_dump(mode="json"), media_type)
+        return Response(content=body, media_type=media_type, headers={"ETag": etag, "Vary": "Accept"})
+    response.headers["ETag"] = etag
+    response.headers["Vary"] = "Accept"
     return task_one
 
 
 @task_router.post("/tasks", response_model=schemas.TaskResponse, status_code=status.HTTP_201_CREATED)
-async def create_new_task(new_task: schemas.TaskCreate, db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    logger.info(f"Creating new task with title={new_task.title}, current user is {current_user.username}")
-    return await task.create_task(db, new_task)
+async def create_new_task(new_task: schemas.TaskCreate, response: Response, db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    request_logger.info("Creating new task with title=%s, current user is %s", new_task.title, current_user.username)
+    db_task = await task.create_task(db, new_task)
+    response.headers["ETag"] = task_etag(db_task)
+    return db_task
 
 
 @task_router.put("/tasks/{task_id}", response_model=schemas.TaskResponse)
-async def update_task(task_id: int, new_task: schemas.TaskUpdate, db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    logger.info(f"Updating task with ID={task_id}, current user is {current_user.username}")
-    db_task = await task.update_task(db=db, task_id=task_id, new_task=new_task)
+async def update_task(task_id: int, new_task: schemas.TaskUpdate, response: Response, if_match: str | None = Header(None), db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    request_logger.info("Updating task with ID=%s, current user is %s", task_id, current_user.username)
+    db_task = await task.update_task(db=db, task_id=task_id, new_task=new_task, if_match=if_match)
+    if db_task is None:
+        handle_task_not_found(task_id)
+    response.headers["ETag"] = task_etag(db_task)
+    request_logger.info("Updated task with ID=%s", task_id)
+    return db_task
+
+
+@task_router.patch("/tasks/{task_id}", response_model=schemas.TaskResponse)
+async def patch_task(task_id: int, new_task: schemas.TaskPatch, response: Response, if_match: str | None = Header(None), db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    request_logger.info("Patching task with ID=%s, current user is %s", task_id, current_user.username)
+    db_task = await task.update_task(db=db, task_id=task_id, new_task=new_task, if_match=if_match)
     if db_task is None:
         handle_task_not_found(task_id)
-    logger.info(f"Updated task with ID={task_id}")
+    response.headers["ETag"] = task_etag(db_task)
+    request_logger.info("Patched task with ID=%s", task_id)
     return db_task
 
 
 @task_router.delete("/tasks/{task_id}", response_model=schemas.TaskResponse)
-async def delete_task(task_id: int, db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    logger.info(f"Deleting task with ID={task_id}, current user is {current_user.username}")
-    db_task = await task.delete_task(db=db, task_id=task_id)
+async def delete_task(task_id: int, if_match: str | None = Header(None), db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
+    request_logger.info("Deleting task with ID=%s, current user is %s", task_id, current_user.username)
+    db_task = await task.delete_task(db=db, task_id=task_id, if_match=if_match)
     if db_task is None:
         handle_task_not_found(task_id)
-    logger.info(f"Deleted task with ID={task_id}")
+    request_logger.info("Deleted task with ID=%s", task_id)
     return db_task
 
 
@@ -0,0 +1,130 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from app.core.logging_config import logger
+from app.crud.task import archive_closed_tasks
+from app.database import AsyncSessionLocal, get_engines
+from app.config import TASK_ARCHIVE_AFTER_DAYS, TASK_ARCHIVE_INTERVAL_SECONDS, TASK_ARCHIVE_BATCH_SIZE
+from app.config import TASK_ARCHIVE_BATCH_PAUSE_SECONDS, TASK_ARCHIVE_VACUUM_PAGES
+
+
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
+
+async def incremental_vacuum(engine, pages: int) -> int:
+    async with engine.connect() as conn:
+        if conn.dialect.name != "sqlite":
+            return 0
+        if (await conn.exec_driver_sql("PRAGMA auto_vacuum")).scalar() != SQLITE_AUTO_VACUUM_INCREMENTAL:
+            return None
+        before = (await conn.exec_driver_sql("PRAGMA freelist_count")).scalar()
+        raw_connection = await conn.get_raw_connection()
+        # sqlite3 steps a statement only once, which frees a single page; executescript runs the pragma to completion
+        await raw_connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({pages})")
+        return before - (await conn.exec_driver_sql("PRAGMA freelist_count")).scalar()
+
+
+async def enable_incremental_vacuum(engine):
+    # auto_vacuum can only be switched on an existing file by rebuilding it once
+    async with engine.connect() as conn:
+        raw_connection = await conn.get_raw_connection()
+        await raw_connection.driver_connection.executescript("PRAGMA auto_vacuum = INCREMENTAL; VACUUM;")
+
+
+class TaskArchiver:
+    def __init__(self, session_factory, after_days: int, interval: float, batch_size: int, batch_pause: float, vacuum_pages: int):
+        self.session_factory = session_factory
+        self.after_days = after_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.vacuum_pages = vacuum_pages
+        self.runs = 0
+        self.archived = 0
+        self.vacuumed_pages = 0
+        self.errors = 0
+        self._task = None
+        self._stopping = None
+        self._vacuum_warned = False
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._stopping = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        # Lets a running batch commit rather than cancelling it halfway through
+        if self._task is not None and not self._task.done():
+            self._stopping.set()
+            await self._task
+        self._task = None
+
+    def stopping(self) -> bool:
+        return self._stopping is not None and self._stopping.is_set()
+
+    async def run_once(self) -> int:
+        closed_before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=self.after_days)
+        archived = 0
+        while not self.stopping():
+            # One short transaction per batch, so request writes get the database lock in between
+            async with self.session_factory() as db:
+                moved = await archive_closed_tasks(db, closed_before, self.batch_size)
+            archived += moved
+            if moved < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause)
+
+        freed = await incremental_vacuum(get_engines()[0], self.vacuum_pages)
+        if freed is None and not self._vacuum_warned:
+            logger.warning("auto_vacuum is not incremental on this database, run python -m app.archive vacuum once to enable it")
+            self._vacuum_warned = True
+        self.runs += 1
+        self.archived += archived
+        self.vacuumed_pages += freed or 0
+        logger.info("Archival run moved %s tasks closed before %s and freed %s pages", archived, closed_before, freed or 0)
+        return archived
+
+    async def _run(self):
+        while not self.stopping():
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.errors += 1
+                logger.error("Task archival run failed: %s", e)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {"runs": self.runs, "archived": self.archived, "vacuumed_pages": self.vacuumed_pages, "errors": self.errors}
+
+
+task_archiver = TaskArchiver(
+    AsyncSessionLocal,
+    TASK_ARCHIVE_AFTER_DAYS,
+    TASK_ARCHIVE_INTERVAL_SECONDS,
+    TASK_ARCHIVE_BATCH_SIZE,
+    TASK_ARCHIVE_BATCH_PAUSE_SECONDS,
+    TASK_ARCHIVE_VACUUM_PAGES
+)
+
+
+if __name__ == "__main__":
+    import argparse
+    from app.core.logging_config import configure_logging
+    from app.database import init_db, dispose_engines
+
+    parser = argparse.ArgumentParser(description="Archive closed tasks and compact the database")
+    parser.add_argument("command", choices=["run", "vacuum"])
+    args = parser.parse_args()
+    configure_logging()
+
+    async def main():
+        await init_db()
+        if args.command == "run":
+            await task_archiver.run_once()
+        else:
+            await enable_incremental_vacuum(get_engines()[0])
+        await dispose_engines()
+
+    asyncio.run(main())
@@ -1,10 +1,139 @@
+import os
+from dataclasses import dataclass, field
+
 PORT = 8000
 
-SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./tasks.db"
+#production server (python -m app.serve); WEB_CONCURRENCY=0 runs one worker per CPU
+SERVER_HOST = os.getenv("HOST", "0.0.0.0")
+SERVER_WORKERS = int(os.getenv("WEB_CONCURRENCY", "0"))
+SERVER_BACKLOG = 2048
+SERVER_KEEP_ALIVE_SECONDS = 5
+# Per worker; connections beyond this are answered 503 instead of queueing without bound
+SERVER_LIMIT_CONCURRENCY = int(os.getenv("SERVER_LIMIT_CONCURRENCY", "1000"))
+# In-flight requests get this long to finish on SIGTERM before the worker runs its shutdown
+SERVER_GRACEFUL_SHUTDOWN_SECONDS = 30
+SERVER_ACCESS_LOG = os.getenv("SERVER_ACCESS_LOG", "false").lower() == "true"
+
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./tasks.db")
+
+#sqlite engine profile: "tuned" applies SQLITE_PRAGMAS and splits reads from writes, "default" uses one plain engine
+SQLITE_ENGINE_PROFILE = os.getenv("SQLITE_ENGINE_PROFILE", "tuned")
+SQLITE_PRAGMAS = {
+    # Only takes effect on a new database file, and only ahead of journal_mode; see python -m app.archive vacuum
+    "auto_vacuum": "INCREMENTAL",
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,
+    "cache_size": -65536,
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+SQLITE_READ_POOL_SIZE = 8
 
 #auth
 SECRET_KEY = "supersecretkey"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-TASKS_FETCH_LIMIT = 100
\ No newline at end of file
+TASKS_FETCH_LIMIT = 100
+TASKS_EXPORT_BATCH_SIZE = 1000
+TASKS_IMPORT_BATCH_SIZE = 1000
+TASKS_IMPORT_MAX_REPORTED_ERRORS = 100
+# Longer import lines are rejected without being buffered
+TASKS_IMPORT_MAX_LINE_LENGTH = 1_000_000
+TASKS_BULK_MAX_ITEMS = 1000
+
+#task list encoding: "fast" reads column tuples and encodes them without re-validation (with orjson when
+#installed), "standard" loads ORM objects and validates each one through TaskResponse
+TASK_SERIALIZER = os.getenv("TASK_SERIALIZER", "fast")
+
+#full-text search: bm25 column weights, so a title match outranks a description match
+TASKS_SEARCH_LIMIT = 20
+TASKS_SEARCH_TITLE_WEIGHT = 10.0
+TASKS_SEARCH_DESCRIPTION_WEIGHT = 1.0
+TASKS_SEARCH_SNIPPET_TOKENS = 12
+TASKS_SEARCH_HIGHLIGHT = ("<mark>", "</mark>")
+
+#change feed: long polls and SSE streams wake at once on writes made in the same worker, and poll every
+#TASKS_CHANGES_POLL_INTERVAL_SECONDS to pick up writes made through other workers
+TASKS_CHANGES_LIMIT = 500
+TASKS_CHANGES_MAX_WAIT_SECONDS = 25
+TASKS_CHANGES_POLL_INTERVAL_SECONDS = 1.0
+TASKS_CHANGES_SSE_HEARTBEAT_SECONDS = 15
+# Streams are closed after this long; EventSource reconnects with Last-Event-ID and carries on where it left off
+TASKS_CHANGES_SSE_MAX_SECONDS = 300
+TASKS_CHANGES_SSE_RETRY_MS = 1000
+
+#archival of closed tasks: a background job in each worker moves tasks closed (last updated) more than
+#TASK_ARCHIVE_AFTER_DAYS ago into tasks_archive, in batches with a pause in between so request writes interleave
+TASK_ARCHIVE_ENABLED = os.getenv("TASK_ARCHIVE_ENABLED", "true").lower() == "true"
+TASK_ARCHIVE_AFTER_DAYS = int(os.getenv("TASK_ARCHIVE_AFTER_DAYS", "90"))
+TASK_ARCHIVE_INTERVAL_SECONDS = 600
+TASK_ARCHIVE_BATCH_SIZE = 200
+TASK_ARCHIVE_BATCH_PAUSE_SECONDS = 0.05
+# Free pages handed back to the filesystem after each run
+TASK_ARCHIVE_VACUUM_PAGES = 2000
+
+#response compression: the best of zstd, br and gzip accepted by the client (zstd and br need the optional
+#zstandard and brotli packages); bodies below COMPRESSION_MINIMUM_SIZE bytes are sent as they are
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+# Fast levels: list pages are compressed per request, so CPU matters more than the last few percent
+COMPRESSION_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+COMPRESSION_PREFERENCE = ("zstd", "br", "gzip")
+
+#password hashing
+PASSWORD_HASH_EXECUTOR = "thread"  # "thread" or "process"
+PASSWORD_HASH_MAX_WORKERS = 4
+# Hashes running or queued on the pool beyond this are rejected with 429 instead of piling up
+PASSWORD_HASH_MAX_IN_FLIGHT = int(os.getenv("PASSWORD_HASH_MAX_IN_FLIGHT", "16"))
+
+#auth throttling: token buckets per client IP and per username on /auth/login and /auth/register
+AUTH_IP_BUCKET_CAPACITY = int(os.getenv("AUTH_IP_BUCKET_CAPACITY", "20"))
+AUTH_IP_BUCKET_REFILL_PER_SECOND = 1.0
+AUTH_USERNAME_BUCKET_CAPACITY = 5
+AUTH_USERNAME_BUCKET_REFILL_PER_SECOND = 0.1
+AUTH_THROTTLE_MAX_KEYS = 100000
+# Delay for logins of unknown users until real verify timings are available
+AUTH_UNKNOWN_USER_DELAY_SECONDS = 0.25
+
+#single-flight reads: identical get_task/get_tasks/get_user_by_username calls running at the same time share one query
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+#batched task lookups: get_task calls for different ids made in the same event-loop tick share one IN (...) query,
+#and GET /tasks?ids= / POST /tasks/lookup resolve up to TASKS_LOOKUP_MAX_IDS ids per request
+TASK_BATCH_LOADING_ENABLED = os.getenv("TASK_BATCH_LOADING_ENABLED", "true").lower() == "true"
+TASKS_LOOKUP_MAX_IDS = 10000
+
+#authenticated principal cache
+PRINCIPAL_CACHE_SIZE = 10000
+PRINCIPAL_CACHE_TTL_SECONDS = 60
+
+#task list response cache
+TASK_LIST_CACHE_SIZE = 1024
+TASK_LIST_CACHE_TTL_SECONDS = 5
+TASK_LIST_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+#group commit of task mutations
+TASK_WRITE_COALESCING = os.getenv("TASK_WRITE_COALESCING", "false").lower() == "true"
+TASK_WRITE_BATCH_MAX = 64
+TASK_WRITE_BATCH_WINDOW_MS = 2
+
+#logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVELS = {
+    "app.requests": os.getenv("REQUEST_LOG_LEVEL", "INFO"),
+    "sqlalchemy.engine": "WARNING",
+}
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+# Share of requests whose per-request log lines are kept; sampled per request id, so a kept request logs all its lines
+LOG_REQUEST_SAMPLE_RATE = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "1.0"))
+
+
+# Per-app settings passed to create_app; defaults come from the constants above
+@dataclass
+class Settings:
+    database_url: str = SQLALCHEMY_DATABASE_URL
+    sqlite_engine_profile: str = SQLITE_ENGINE_PROFILE
+    sqlite_pragmas: dict = field(default_factory=lambda: dict(SQLITE_PRAGMAS))
+    sqlite_read_pool_size: int = SQLITE_READ_POOL_SIZE
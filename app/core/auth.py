@@ -1,11 +1,13 @@
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 import jwt
 from fastapi import HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db
+from app.database import get_read_db
 from app.crud.user import get_user_by_username
+from app.core.cache import principal_cache
 from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
 
 
@@ -19,23 +21,32 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def verify_token(token: str, credentials_exception):
+def decode_token(token: str, credentials_exception):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": True})
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        return username
     except jwt.PyJWTError:
         raise credentials_exception
+    if payload.get("sub") is None:
+        raise credentials_exception
+    return payload
+
+
+def verify_token(token: str, credentials_exception):
+    return decode_token(token, credentials_exception)["sub"]
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_read_db)):
     credentials_exception = HTTPException(
         status_code=401, detail="Invalid authentication credentials", headers={"WWW-Authenticate": "Bearer"}
     )
-    username = verify_token(token, credentials_exception)
-    user = await get_user_by_username(db, username)
+    # The token was fully verified when it was cached, and the entry never outlives its expiry
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
+    payload = decode_token(token, credentials_exception)
+    user = await get_user_by_username(db, payload["sub"])
     if user is None:
         raise credentials_exception
+    principal_cache.set(token, user, ttl=payload["exp"] - time.time())
     return user
\ No newline at end of file
@@ -0,0 +1,60 @@
+import asyncio
+from app.core.metrics import batch_loader_keys
+
+
+class BatchLoader:
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self.batches = 0
+        self.keys = 0
+        self._pending = None
+
+    async def load(self, key, fetch_many):
+        # fetch_many(keys) returns {key: value}; loads issued in the same event-loop tick share one call
+        if not self.enabled:
+            return (await fetch_many([key])).get(key)
+        while True:
+            if self._pending is not None:
+                batch = self._pending
+                future = batch.get(key)
+                if future is None:
+                    future = batch[key] = asyncio.get_running_loop().create_future()
+                try:
+                    return await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    # The caller running the batch was cancelled, not this one: load again in a new batch
+                    if not future.cancelled():
+                        raise
+                    continue
+            return await self._run_batch(key, fetch_many)
+
+    async def _run_batch(self, key, fetch_many):
+        batch = self._pending = {key: asyncio.get_running_loop().create_future()}
+        try:
+            # Lets every other coroutine that is ready this tick add its key before the query runs
+            await asyncio.sleep(0)
+            if self._pending is batch:
+                self._pending = None
+            self.batches += 1
+            self.keys += len(batch)
+            batch_loader_keys.observe(len(batch), self.name)
+            found = await fetch_many(list(batch))
+        except asyncio.CancelledError:
+            if self._pending is batch:
+                self._pending = None
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in batch.values():
+                future.set_exception(e)
+                # Marks the exception as retrieved, so futures nobody awaited do not warn when collected
+                future.exception()
+            raise
+        for batch_key, future in batch.items():
+            future.set_result(found.get(batch_key))
+        return found.get(key)
+
+    def stats(self) -> dict:
+        return {"batches": self.batches, "keys": self.keys}
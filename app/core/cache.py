@@ -0,0 +1,88 @@
+import time
+from collections import OrderedDict
+from app.config import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS
+from app.config import TASK_LIST_CACHE_SIZE, TASK_LIST_CACHE_TTL_SECONDS, TASK_LIST_CACHE_MAX_BYTES
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float, max_bytes: int | None = None, weigh=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.weigh = weigh
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._pop(key)
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        weight = self.weigh(value) if self.weigh else 0
+        if ttl <= 0 or (self.max_bytes is not None and weight > self.max_bytes):
+            return
+        self._pop(key)
+        self._data[key] = (time.monotonic() + ttl, value, weight)
+        self.bytes += weight
+        while len(self._data) > self.maxsize or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            self._pop(next(iter(self._data)))
+            self.evictions += 1
+
+    def invalidate(self, key):
+        self._pop(key)
+
+    def invalidate_where(self, predicate):
+        for key in [key for key, (_, value, _) in self._data.items() if predicate(value)]:
+            self._pop(key)
+
+    def clear(self):
+        self._data.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "bytes": self.bytes, "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+# Resolved users keyed by bearer token, so authenticated requests skip the users lookup
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def invalidate_principal(username: str):
+    principal_cache.invalidate_where(lambda user: getattr(user, "username", None) == username)
+
+
+# Serialised GET /tasks pages as (body, headers), keyed by query parameters and task_table_version.
+# The TTL bounds staleness when other worker processes write to the same database.
+task_list_cache = TTLCache(
+    maxsize=TASK_LIST_CACHE_SIZE,
+    ttl=TASK_LIST_CACHE_TTL_SECONDS,
+    max_bytes=TASK_LIST_CACHE_MAX_BYTES,
+    weigh=lambda entry: len(entry[0])
+)
+task_table_version = 0
+
+
+def bump_task_table_version():
+    global task_table_version
+    task_table_version += 1
+    # Entries for older versions can never be hit again, so release their memory right away
+    task_list_cache.clear()
@@ -0,0 +1,34 @@
+import asyncio
+
+
+class ChangeNotifier:
+    def __init__(self):
+        self.notifications = 0
+        self._waiters = set()
+
+    def notify(self):
+        self.notifications += 1
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+    async def wait(self, timeout: float) -> bool:
+        # True when notify() was called before the timeout ran out
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters.discard(waiter)
+
+    def stats(self) -> dict:
+        return {"waiters": len(self._waiters), "notifications": self.notifications}
+
+
+# Woken after every committed task write in this process, so change feed clients answer right away;
+# writes made by other worker processes are picked up by polling
+task_changes = ChangeNotifier()
@@ -0,0 +1,166 @@
+import zlib
+from app.core.etag import coded_etag
+
+try:
+    import brotli
+except ImportError:  # optional, br is not offered without it
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, zstd is not offered without it
+    zstandard = None
+
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/msgpack", "application/cbor", "text/")
+# SSE events must reach the client exactly as they are written
+SKIPPED_TYPES = ("text/event-stream",)
+
+
+class GzipCodec:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level, wbits=31)
+
+    def stream(self):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return lambda data: compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+class BrotliCodec:
+    name = "br"
+
+    def __init__(self, level: int):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=self.level)
+
+    def stream(self):
+        compressor = brotli.Compressor(quality=self.level)
+        return lambda data: compressor.process(data) + compressor.flush(), compressor.finish
+
+
+class ZstdCodec:
+    name = "zstd"
+
+    def __init__(self, level: int):
+        self.compressor = zstandard.ZstdCompressor(level=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def stream(self):
+        compressor = self.compressor.compressobj()
+        return lambda data: compressor.compress(data) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK), compressor.flush
+
+
+def available_codecs(levels: dict) -> dict:
+    codecs = {"gzip": GzipCodec(levels["gzip"])}
+    if brotli is not None:
+        codecs["br"] = BrotliCodec(levels["br"])
+    if zstandard is not None:
+        codecs["zstd"] = ZstdCodec(levels["zstd"])
+    return codecs
+
+
+def choose_encoding(accept_encoding: str, preference: tuple) -> str | None:
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    wildcard = qualities.get("*", 0.0)
+    best, best_score = None, None
+    for rank, coding in enumerate(preference):
+        quality = qualities.get(coding, wildcard)
+        score = (quality, -rank)
+        if quality > 0 and (best_score is None or score > best_score):
+            best, best_score = coding, score
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int, levels: dict, preference: tuple = ("zstd", "br", "gzip")):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.codecs = available_codecs(levels)
+        self.preference = tuple(coding for coding in preference if coding in self.codecs)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept_encoding = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"accept-encoding"), "")
+        coding = choose_encoding(accept_encoding, self.preference) if accept_encoding else None
+        if coding is None:
+            return await self.app(scope, receive, send)
+
+        codec = self.codecs[coding]
+        start = None
+        compress_chunk = finish = None
+
+        async def send_compressed(message):
+            nonlocal start, compress_chunk, finish
+            if message["type"] == "http.response.start":
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if (b"content-encoding" in headers or content_type.startswith(SKIPPED_TYPES)
+                        or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                    return await send(message)
+                # Held back until the first body chunk shows whether the response is worth compressing
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compress_chunk is None:
+                if not more_body:
+                    response_start, start = start, None
+                    if len(body) < self.minimum_size:
+                        await send(response_start)
+                        return await send(message)
+                    compressed = codec.compress(body)
+                    await send(self.compressed_start(response_start, codec.name, len(compressed)))
+                    return await send({"type": "http.response.body", "body": compressed})
+                # Streamed responses are compressed chunk by chunk and flushed, so each chunk still goes out right away
+                compress_chunk, finish = codec.stream()
+                await send(self.compressed_start(start, codec.name, None))
+            if more_body:
+                return await send({"type": "http.response.body", "body": compress_chunk(body), "more_body": True})
+            await send({"type": "http.response.body", "body": compress_chunk(body) + finish()})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def compressed_start(message, coding: str, length: int | None):
+        headers = []
+        vary = None
+        for name, value in message.get("headers", []):
+            lowered = name.lower()
+            if lowered == b"content-length":
+                continue
+            if lowered == b"etag" and not value.startswith(b"W/"):
+                # The encoded bytes differ from the identity representation, so they get their own strong
+                # validator; If-Match and If-None-Match strip the coding again
+                value = coded_etag(value.decode("latin-1"), coding).encode("latin-1")
+            if lowered == b"vary":
+                vary = value
+                continue
+            headers.append((name, value))
+        headers.append((b"content-encoding", coding.encode("latin-1")))
+        headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode("latin-1")))
+        return {**message, "headers": headers}
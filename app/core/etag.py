@@ -0,0 +1,67 @@
+import hashlib
+from app.serialization import JSON, available_media_types
+
+
+def _hash(*parts) -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _digest(*parts) -> str:
+    return f'"{_hash(*parts)}"'
+
+
+# CompressionMiddleware gives each content coding its own strong validator ("<etag>-zstd"); comparisons
+# against the identity ETag computed by the handlers drop the coding again
+CONTENT_CODINGS = ("gzip", "br", "zstd")
+
+
+def coded_etag(etag: str, coding: str) -> str:
+    return f'{etag[:-1]}-{coding}"'
+
+
+def strip_coding(etag: str) -> str:
+    for coding in CONTENT_CODINGS:
+        if etag.endswith(f'-{coding}"'):
+            return etag[:-len(coding) - 2] + '"'
+    return etag
+
+
+# The media type is part of every ETag: JSON, MessagePack and CBOR bodies are different representations
+def task_etag(db_task, media_type: str = JSON) -> str:
+    # Every write gives the row a new revision, so the revision alone names the task state and If-Match
+    # can be checked by the UPDATE/DELETE itself; the hash ties the validator to the task and media type
+    return f'"{db_task.revision}-{_hash(db_task.id, db_task.revision, media_type)}"'
+
+
+def collection_etag(db_tasks, *query_parts, media_type: str = JSON) -> str:
+    return _digest(media_type, *query_parts, *(task_etag(db_task) for db_task in db_tasks))
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    # If-None-Match compares weakly, so weak, strong and content-coded forms of the same validator all match
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [strip_coding(candidate.strip().removeprefix("W/")) for candidate in header.split(",")]
+    return strip_coding(etag.removeprefix("W/")) in candidates
+
+
+def if_match_revisions(header: str, task_id: int) -> set[int] | None:
+    # Revisions named by the strong validators of task_id in an If-Match header; None for "*" (any revision).
+    # A validator of any representation identifies the same task state
+    if header.strip() == "*":
+        return None
+    revisions = set()
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            continue
+        revision, _, digest = strip_coding(candidate).strip('"').partition("-")
+        if revision.isdigit() and any(digest == _hash(task_id, int(revision), media_type) for media_type in available_media_types()):
+            revisions.add(int(revision))
+    return revisions
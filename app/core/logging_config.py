@@ -1,24 +1,96 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import zlib
+from contextvars import ContextVar
+from app.config import LOG_LEVEL, LOG_LEVELS, LOG_FORMAT, LOG_REQUEST_SAMPLE_RATE
 
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 
 LOG_DIR = os.path.join(ROOT_DIR, "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
-
 LOG_FILE = os.path.join(LOG_DIR, "app.log")
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(request_id)s - %(filename)s:%(lineno)d - %(message)s"
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class RequestSampleFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.threshold = int(rate * 10000)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.threshold >= 10000:
+            return True
+        return zlib.crc32(request_id_var.get().encode()) % 10000 < self.threshold
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "location": f"{record.filename}:{record.lineno}",
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def configure_logging():
+    # Records go through a queue; a background thread formats them and does the file and console I/O,
+    # so the event loop never blocks on a disk write
+    global _listener
+    if _listener is not None:
+        return
+
+    os.makedirs(LOG_DIR, exist_ok=True)
+    formatter = JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+    file_handler = logging.FileHandler(LOG_FILE)
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.handlers = [queue_handler]
+    for name, level in LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level)
+    logging.getLogger("app.requests").addFilter(RequestSampleFilter(LOG_REQUEST_SAMPLE_RATE))
+    logging.getLogger("app").info("Logger is running! Logs are in the logs/ folder at the root of the project.")
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
-logger.info("Logger is running! Logs are in the logs/ folder at the root of the project.")
\ No newline at end of file
+logger = logging.getLogger("app")
+# High-volume lines logged on every request; sampled by LOG_REQUEST_SAMPLE_RATE
+request_logger = logging.getLogger("app.requests")
@@ -0,0 +1,176 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labelnames, labelvalues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.values = defaultdict(float)
+
+    def inc(self, *labelvalues, amount: float = 1):
+        self.values[labelvalues] += amount
+
+    def samples(self):
+        for labelvalues, value in self.values.items():
+            yield f"{self.name}{_labels(self.labelnames, labelvalues)} {value}"
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labelvalues -> [per-bucket counts..., +Inf count, sum]
+        self.values = {}
+
+    def observe(self, value: float, *labelvalues):
+        series = self.values.get(labelvalues)
+        if series is None:
+            series = self.values[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self):
+        for labelvalues, series in self.values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {series[-1]}"
+            yield f"{self.name}_count{_labels(self.labelnames, labelvalues)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        # collector() returns (name, description, {labelvalue: value}, labelname) gauge families
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        for collector in self.collectors:
+            for name, description, values, labelname in collector():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} gauge")
+                for labelvalue, value in values.items():
+                    lines.append(f"{name}{_labels((labelname,), (labelvalue,))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by method, route and status code.", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route.", ("method", "route")
+))
+db_queries_total = registry.register(Counter(
+    "db_queries_total", "SQL statements executed by statement type.", ("statement",)
+))
+db_query_duration_seconds = registry.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time by statement type.", ("statement",)
+))
+db_sessions_total = registry.register(Counter(
+    "db_sessions_total", "Database sessions opened and closed by get_db/get_read_db.", ("pool", "event")
+))
+password_hash_duration_seconds = registry.register(Histogram(
+    "password_hash_duration_seconds", "bcrypt time spent in hash_password/verify_password.", ("function",),
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0)
+))
+password_hash_queue_seconds = registry.register(Histogram(
+    "password_hash_queue_seconds", "Time password hashing calls waited for a free pool worker.", ("function",)
+))
+
+auth_throttled_total = registry.register(Counter(
+    "auth_throttled_total", "Auth requests rejected with 429 by endpoint and reason.", ("endpoint", "reason")
+))
+auth_unknown_user_total = registry.register(Counter(
+    "auth_unknown_user_total", "Logins for unknown usernames answered without running bcrypt."
+))
+
+singleflight_calls_total = registry.register(Counter(
+    "singleflight_calls_total", "Coalesced reads by operation: leader calls ran the query, coalesced calls shared its result.", ("operation", "result")
+))
+batch_loader_keys = registry.register(Histogram(
+    "batch_loader_keys", "Keys fetched per batched query by operation.", ("operation",),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500)
+))
+
+
+def statement_type(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA") else "OTHER"
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which is dropped with the statement, so a statement that raises
+    # leaves nothing behind on the pooled connection
+    context._query_start_time = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start_time
+    kind = statement_type(statement)
+    db_queries_total.inc(kind)
+    db_query_duration_seconds.observe(elapsed, kind)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Label by route template, never by raw path, so ids do not explode the series count
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_requests_total.inc(scope["method"], route, status_code)
+            http_request_duration_seconds.observe(time.perf_counter() - started, scope["method"], route)
@@ -0,0 +1,54 @@
+import asyncio
+from app.core.metrics import singleflight_calls_total
+
+
+class SingleFlight:
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self.leaders = 0
+        self.coalesced = 0
+        self._flights = {}
+
+    async def do(self, key, function):
+        # function() runs once per key at a time; identical calls arriving while it runs await its result
+        if not self.enabled:
+            return await function()
+        while key in self._flights:
+            flight = self._flights[key]
+            self.coalesced += 1
+            singleflight_calls_total.inc(self.name, "coalesced")
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                # The leader's request was cancelled, not this one: run the call again instead of failing
+                if not flight.cancelled():
+                    raise
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self.leaders += 1
+        singleflight_calls_total.inc(self.name, "leader")
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Marks the exception as retrieved, so a flight nobody joined does not warn when collected
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def forget(self, key):
+        # Calls made from now on start a new flight instead of joining one that began before a write
+        self._flights.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._flights), "leaders": self.leaders, "coalesced": self.coalesced}
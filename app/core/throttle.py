@@ -0,0 +1,60 @@
+import time
+from collections import OrderedDict
+from app.config import AUTH_IP_BUCKET_CAPACITY, AUTH_IP_BUCKET_REFILL_PER_SECOND
+from app.config import AUTH_USERNAME_BUCKET_CAPACITY, AUTH_USERNAME_BUCKET_REFILL_PER_SECOND
+from app.config import AUTH_THROTTLE_MAX_KEYS, AUTH_UNKNOWN_USER_DELAY_SECONDS
+
+
+class TokenBucketLimiter:
+    def __init__(self, capacity: float, refill_per_second: float, max_keys: int = 100000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self.allowed = 0
+        self.rejected = 0
+        # key -> (tokens, last refill time), least recently seen first
+        self._buckets = OrderedDict()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def acquire(self, key) -> float:
+        # Returns 0 when a token was taken, otherwise the seconds until one is available
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.refill_per_second)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+            self.allowed += 1
+        else:
+            retry_after = (1 - tokens) / self.refill_per_second
+            self.rejected += 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def clear(self):
+        self._buckets.clear()
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), "allowed": self.allowed, "rejected": self.rejected}
+
+
+class LatencyAverage:
+    # Exponentially weighted mean, so it follows changes in hash cost or pool load
+    def __init__(self, initial: float, weight: float = 0.1):
+        self.value = initial
+        self.weight = weight
+        self.samples = 0
+
+    def observe(self, seconds: float):
+        self.value = seconds if self.samples == 0 else self.value + self.weight * (seconds - self.value)
+        self.samples += 1
+
+
+ip_limiter = TokenBucketLimiter(AUTH_IP_BUCKET_CAPACITY, AUTH_IP_BUCKET_REFILL_PER_SECOND, AUTH_THROTTLE_MAX_KEYS)
+username_limiter = TokenBucketLimiter(AUTH_USERNAME_BUCKET_CAPACITY, AUTH_USERNAME_BUCKET_REFILL_PER_SECOND, AUTH_THROTTLE_MAX_KEYS)
+# Observed verify latency, queueing included, used to delay answers for unknown usernames
+verify_latency = LatencyAverage(AUTH_UNKNOWN_USER_DELAY_SECONDS)
@@ -0,0 +1,93 @@
+import asyncio
+from app.core.logging_config import logger
+from app.database import AsyncSessionLocal
+from app.config import TASK_WRITE_BATCH_MAX, TASK_WRITE_BATCH_WINDOW_MS
+
+
+class GroupCommitQueue:
+    def __init__(self, session_factory, max_batch: int, window_ms: float):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.window = window_ms / 1000
+        self.batches = 0
+        self.operations = 0
+        self.fallbacks = 0
+        self._queue = None
+        self._worker = None
+        self._loop = None
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None and not self._worker.done() and self._loop is asyncio.get_running_loop():
+            await self._queue.put(None)
+            await self._worker
+        self._worker = None
+
+    async def submit(self, operation, *args):
+        # operation(db, *args) applies one mutation without committing; the worker commits it
+        # together with whatever else arrived in the same window and resolves this caller's future
+        self.start()
+        future = self._loop.create_future()
+        await self._queue.put((operation, args, future))
+        return await future
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = self._loop.time() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), max(deadline - self._loop.time(), 0))
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._commit_batch(batch)
+
+    async def _commit_batch(self, batch):
+        self.batches += 1
+        self.operations += len(batch)
+        try:
+            async with self.session_factory() as db:
+                results = [await operation(db, *args) for operation, args, _ in batch]
+                await db.commit()
+        except Exception as e:
+            # One bad mutation must not fail its neighbours: replay them one commit each
+            logger.warning("Group commit of %s writes failed (%s), retrying individually", len(batch), e)
+            self.fallbacks += 1
+            for item in batch:
+                await self._commit_one(*item)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _commit_one(self, operation, args, future):
+        try:
+            async with self.session_factory() as db:
+                result = await operation(db, *args)
+                await db.commit()
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {"batches": self.batches, "operations": self.operations, "fallbacks": self.fallbacks}
+
+
+task_write_queue = GroupCommitQueue(AsyncSessionLocal, TASK_WRITE_BATCH_MAX, TASK_WRITE_BATCH_WINDOW_MS)
@@ -1,76 +1,469 @@
-from app.core.logging_config import logger
+from app.core.logging_config import logger, request_logger
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.models.task import Task
+from sqlalchemy import select, insert, update, delete, tuple_, case
+from datetime import datetime, timezone
+from app.models.task import Task, TaskStatus, TaskTombstone, ArchivedTask, latest_revision, next_revision
 from app import schemas
 from fastapi import HTTPException
+from app.config import TASK_WRITE_COALESCING, SINGLE_FLIGHT_ENABLED, TASK_BATCH_LOADING_ENABLED
+from app.core.write_queue import task_write_queue
+from app.core.etag import if_match_revisions
+from app.core.cache import bump_task_table_version
+from app.core import cache
+from app.core.singleflight import SingleFlight
+from app.core.batchloader import BatchLoader
+from app.core.changes import task_changes
+from app.search import search_hits
+from app.config import TASKS_SEARCH_TITLE_WEIGHT, TASKS_SEARCH_DESCRIPTION_WEIGHT, TASKS_SEARCH_SNIPPET_TOKENS, TASKS_SEARCH_HIGHLIGHT
 
 
-async def get_tasks(db: AsyncSession, skip: int = 0, limit: int = 100):
-    logger.info(f"Fetching tasks with skip={skip} and limit={limit}")
-    result = await db.execute(select(Task).offset(skip).limit(limit))
-    return result.scalars().all()
+# Stays well below SQLite's bound parameter limit for IN (...) lists
+BULK_CHUNK_SIZE = 500
+
+
+def _chunked(items: list, size: int = BULK_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# Reads are keyed by task_table_version, so a read that starts after a write in this process never
+# joins a query that began before it
+task_reads = SingleFlight("get_task", SINGLE_FLIGHT_ENABLED)
+task_list_reads = SingleFlight("get_tasks", SINGLE_FLIGHT_ENABLED)
+# Distinct ids requested in the same event-loop tick are then fetched together
+task_loader = BatchLoader("get_task", TASK_BATCH_LOADING_ENABLED)
+
+
+def tasks_changed():
+    bump_task_table_version()
+    task_changes.notify()
+
+
+def tombstones_for(task_ids: list[int]):
+    # Inserted before the rows are deleted, so each tombstone's revision is above the one of the task it replaces
+    return insert(TaskTombstone).from_select(["task_id"], select(Task.id).where(Task.id.in_(task_ids)))
+
+
+def tombstone_for_deleted(db_task: Task):
+    # The deleted row may have held the highest revision, so the tombstone is placed above it explicitly
+    revision = next_revision()
+    return insert(TaskTombstone).values(task_id=db_task.id, revision=case((revision > db_task.revision, revision), else_=db_task.revision + 1))
+
+
+async def _get_tasks_by_ids(db: AsyncSession, task_ids: list[int]) -> dict[int, Task]:
+    found = {}
+    for chunk in _chunked(list(set(task_ids))):
+        query = select(Task).where(Task.id.in_(chunk)).execution_options(populate_existing=True)
+        result = await db.execute(query)
+        found.update({db_task.id: db_task for db_task in result.scalars().all()})
+    return found
+
+
+def as_stored_timestamp(value: datetime | None) -> datetime | None:
+    # Timestamps are stored as naive UTC text, so aware values are converted before they are compared
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+TASK_SORT_COLUMNS = {
+    "id": Task.id,
+    "created_at": Task.created_at,
+    "updated_at": Task.updated_at,
+    "title": Task.title,
+}
+
+
+async def get_tasks(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: int | None = None,
+    after_value=None,
+    sort: str = "id",
+    order: str = "asc",
+    status: TaskStatus | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    updated_after: datetime | None = None,
+    as_rows: bool = False
+):
+    request_logger.info(
+        "Fetching tasks with skip=%s, after_id=%s, limit=%s, sort=%s %s, status=%s, created_after=%s, created_before=%s, updated_after=%s",
+        skip, after_id, limit, sort, order, status, created_after, created_before, updated_after
+    )
+    created_after, created_before, updated_after = (as_stored_timestamp(value) for value in (created_after, created_before, updated_after))
+    column = TASK_SORT_COLUMNS[sort]
+    descending = order == "desc"
+    # Column tuples skip ORM instance construction and the identity map
+    query = (select(*Task.__table__.c) if as_rows else select(Task)).limit(limit)
+    if status is not None:
+        query = query.where(Task.status == status)
+    if created_after is not None:
+        query = query.where(Task.created_at > created_after)
+    if created_before is not None:
+        query = query.where(Task.created_at < created_before)
+    if updated_after is not None:
+        query = query.where(Task.updated_at > updated_after)
+
+    # id breaks ties, and every sort index implicitly ends in the rowid, so (column, id) is index order
+    if column is Task.id:
+        # Walking the table in id order until the limit is reached scans every row when a date filter is
+        # selective. Ordering by id + 0 hides the rowid order, so the filtered date index is used instead
+        # and only matching rows are sorted. A status filter keeps id order through ix_tasks_status
+        range_filtered = status is None and (created_after, created_before, updated_after) != (None, None, None)
+        id_order = Task.id + 0 if range_filtered else Task.id
+        query = query.order_by(id_order.desc() if descending else id_order)
+    else:
+        query = query.order_by(column.desc(), Task.id.desc()) if descending else query.order_by(column, Task.id)
+
+    if after_id is not None:
+        # Keyset seek on (sort column, id), so deep pages cost the same as the first one
+        key = Task.id if column is Task.id else tuple_(column, Task.id)
+        value = after_id if column is Task.id else (after_value, after_id)
+        query = query.where(key < value if descending else key > value)
+    else:
+        query = query.offset(skip)
+    key = (cache.task_table_version, skip, limit, after_id, after_value, sort, order, status, created_after, created_before, updated_after, as_rows)
+    return await task_list_reads.do(key, lambda: _fetch_tasks(db, query, as_rows))
+
+
+async def _fetch_tasks(db: AsyncSession, query, as_rows: bool):
+    result = await db.execute(query)
+    return result.all() if as_rows else result.scalars().all()
+
+
+async def search_tasks(db: AsyncSession, match: str, limit: int = 20, after_id: int | None = None, after_score: float | None = None):
+    request_logger.info("Searching tasks for %s with after_id=%s and limit=%s", match, after_id, limit)
+    hits = search_hits(match, TASKS_SEARCH_TITLE_WEIGHT, TASKS_SEARCH_DESCRIPTION_WEIGHT, TASKS_SEARCH_SNIPPET_TOKENS, TASKS_SEARCH_HIGHLIGHT)
+    # bm25 is lower for better matches; id breaks ties so the keyset is total
+    query = (
+        select(Task, hits.c.score, hits.c.title_highlight, hits.c.snippet)
+        .join(hits, hits.c.id == Task.id)
+        .order_by(hits.c.score, Task.id)
+        .limit(limit)
+    )
+    if after_id is not None:
+        query = query.where(tuple_(hits.c.score, Task.id) > (after_score, after_id))
+    result = await db.execute(query)
+    return result.all()
+
+
+async def get_task_changes(db: AsyncSession, since: int, limit: int = 500):
+    request_logger.info("Fetching task changes since revision %s with limit=%s", since, limit)
+    # Everything up to head is committed; later writes get higher revisions and land on the next call
+    head = (await db.execute(select(latest_revision()))).scalar_one()
+    if since >= head:
+        return head, [], []
+    changed_query = (
+        select(*Task.__table__.c).where(Task.revision > since, Task.revision <= head)
+        .order_by(Task.revision, Task.id)
+    )
+    deleted_query = (
+        select(TaskTombstone.revision, TaskTombstone.task_id).where(TaskTombstone.revision > since, TaskTombstone.revision <= head)
+        .order_by(TaskTombstone.revision, TaskTombstone.id)
+    )
+    changed = (await db.execute(changed_query.limit(limit))).all()
+    deleted = (await db.execute(deleted_query.limit(limit))).all()
+    revisions = sorted(row.revision for row in (*changed, *deleted))
+    if len(revisions) < limit:
+        return head, changed, [row.task_id for row in deleted]
+
+    # The page ends on a whole revision; a bulk write sharing one revision is never split across pages
+    revision = revisions[limit - 1]
+    if len(changed) == limit and changed[-1].revision == revision:
+        changed = (await db.execute(changed_query.where(Task.revision <= revision))).all()
+    if len(deleted) == limit and deleted[-1].revision == revision:
+        deleted = (await db.execute(deleted_query.where(TaskTombstone.revision <= revision))).all()
+    return (
+        revision,
+        [row for row in changed if row.revision <= revision],
+        [row.task_id for row in deleted if row.revision <= revision]
+    )
+
+
+async def stream_task_rows(db: AsyncSession, batch_size: int = 1000):
+    request_logger.info("Streaming tasks in batches of %s", batch_size)
+    # Plain rows from a server-side cursor: nothing is materialised or tracked by the session
+    result = await db.stream(select(Task.__table__).order_by(Task.id).execution_options(yield_per=batch_size))
+    async for row in result.mappings():
+        yield row
 
 
 async def get_task(db: AsyncSession, task_id: int):
-    logger.info(f"Fetching task with ID={task_id}")
+    request_logger.info("Fetching task with ID=%s", task_id)
+    return await task_reads.do((cache.task_table_version, task_id), lambda: task_loader.load(task_id, lambda task_ids: _load_tasks(db, task_ids)))
+
+
+async def _load_tasks(db: AsyncSession, task_ids: list[int]) -> dict[int, Task]:
+    if len(task_ids) == 1:
+        db_task = await _get_task(db, task_ids[0])
+        return {} if db_task is None else {db_task.id: db_task}
+    try:
+        return await _get_tasks_by_ids(db, task_ids)
+    except Exception as e:
+        logger.error("Error fetching %s tasks: %s", len(task_ids), e)
+        return {}
+
+
+async def lookup_tasks(db: AsyncSession, task_ids: list[int]):
+    request_logger.info("Looking up %s tasks by ID", len(task_ids))
+    found = await _get_tasks_by_ids(db, task_ids)
+    missing = [task_id for task_id in set(task_ids) if task_id not in found]
+    if missing:
+        # Same fallback as a single read: archived tasks are still resolvable by id
+        for chunk in _chunked(missing):
+            result = await db.execute(select(ArchivedTask).where(ArchivedTask.id.in_(chunk)))
+            found.update({archived.id: archived for archived in result.scalars().all()})
+    request_logger.info("Found %s of %s tasks", len(found), len(set(task_ids)))
+    return [found.get(task_id) for task_id in task_ids]
+
+
+# Uncoalesced, for reads that must see the caller's own transaction
+async def _get_task(db: AsyncSession, task_id: int):
     try:
         result = await db.execute(select(Task).where(Task.id == task_id))
         return result.scalar_one_or_none()
     except Exception as e:
-        logger.error(f"Error fetching task: {str(e)}")
+        logger.error("Error fetching task: %s", e)
         return None
 
 
+async def get_archived_task(db: AsyncSession, task_id: int):
+    request_logger.info("Fetching archived task with ID=%s", task_id)
+    try:
+        result = await db.execute(select(ArchivedTask).where(ArchivedTask.id == task_id))
+        return result.scalar_one_or_none()
+    except Exception as e:
+        logger.error("Error fetching archived task: %s", e)
+        return None
+
+
+ARCHIVED_COLUMNS = ["id", "title", "description", "status", "created_at", "updated_at", "revision"]
+
+
+async def archive_closed_tasks(db: AsyncSession, closed_before: datetime, batch_size: int) -> int:
+    # Served by ix_tasks_status_updated_at. Task ids are never reused, so an id is archived at most once;
+    # only ids reused before the upgrade to AUTOINCREMENT can already be taken, and those tasks stay live
+    already_archived = select(ArchivedTask.id).where(ArchivedTask.id == Task.id).exists()
+    candidates = (
+        select(*(Task.__table__.c[name] for name in ARCHIVED_COLUMNS))
+        .where(Task.status == TaskStatus.closed, Task.updated_at < closed_before, ~already_archived)
+        .order_by(Task.updated_at)
+        .limit(batch_size)
+    )
+    try:
+        # Copy, tombstone and delete in one transaction; the write statement comes first, so the batch is
+        # chosen under the write lock and concurrent archivers in other workers never pick the same rows
+        result = await db.execute(insert(ArchivedTask).from_select(ARCHIVED_COLUMNS, candidates).returning(ArchivedTask.id))
+        task_ids = result.scalars().all()
+        if task_ids:
+            # The feed mirrors GET /tasks, so clients drop archived tasks like deleted ones
+            await db.execute(tombstones_for(task_ids))
+            await db.execute(delete(Task).where(Task.id.in_(task_ids)))
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error archiving closed tasks: %s", e)
+        raise
+    if task_ids:
+        tasks_changed()
+        logger.info("Archived %s closed tasks", len(task_ids))
+    return len(task_ids)
+
+
+async def submit_write(operation, *args):
+    try:
+        result = await task_write_queue.submit(operation, *args)
+        if result is not None:
+            tasks_changed()
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error in coalesced task write: %s", e)
+        raise HTTPException(status_code=500, detail="Database error")
+
+
+# Uncommitted variants of the single-task mutations, committed in groups by task_write_queue
+async def _create_task(db: AsyncSession, new_task: schemas.TaskCreate):
+    db_task = Task(**new_task.model_dump())
+    db.add(db_task)
+    await db.flush()
+    await db.refresh(db_task)
+    return db_task
+
+
+def if_match_condition(revisions: set[int] | None):
+    # The precondition is part of the write's WHERE clause, so a write committed by another request or
+    # worker after the client read the task can never be overwritten
+    return [] if revisions is None else [Task.revision.in_(revisions)]
+
+
+def precondition_failed(task_id: int):
+    logger.warning("If-Match precondition failed for task with ID=%s", task_id)
+    raise HTTPException(status_code=412, detail="Task has been modified")
+
+
+async def _update_task(db: AsyncSession, task_id: int, new_task: schemas.TaskUpdate | schemas.TaskPatch, if_match: str | None = None):
+    values = new_task.model_dump(exclude_unset=True)
+    revisions = None if if_match is None else if_match_revisions(if_match, task_id)
+    if not values:
+        db_task = await _get_task(db, task_id)
+        if db_task is not None and revisions is not None and db_task.revision not in revisions:
+            precondition_failed(task_id)
+        return db_task
+    # UPDATE ... RETURNING writes only the given columns and reads the row back in one statement
+    result = await db.execute(
+        update(Task).where(Task.id == task_id, *if_match_condition(revisions)).values(**values).returning(Task)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    db_task = result.scalar_one_or_none()
+    # No row came back: either the task is gone or it was written since the client read it
+    if db_task is None and revisions is not None and await _get_task(db, task_id) is not None:
+        precondition_failed(task_id)
+    return db_task
+
+
+async def _delete_task(db: AsyncSession, task_id: int, if_match: str | None = None):
+    revisions = None if if_match is None else if_match_revisions(if_match, task_id)
+    result = await db.execute(
+        delete(Task).where(Task.id == task_id, *if_match_condition(revisions)).returning(Task).execution_options(synchronize_session=False)
+    )
+    db_task = result.scalar_one_or_none()
+    if db_task is not None:
+        await db.execute(tombstone_for_deleted(db_task))
+    elif revisions is not None and await _get_task(db, task_id) is not None:
+        precondition_failed(task_id)
+    return db_task
+
+
 async def create_task(db: AsyncSession, new_task: schemas.TaskCreate):
-    logger.info(f"Creating new task with title={new_task.title}")
+    request_logger.info("Creating new task with title=%s", new_task.title)
+    if TASK_WRITE_COALESCING:
+        return await submit_write(_create_task, new_task)
     db_task = Task(**new_task.model_dump())
 
     db.add(db_task)
     try:
         await db.commit()
+        tasks_changed()
         await db.refresh(db_task)
-        logger.info(f"Created task with ID={db_task.id}")
+        request_logger.info("Created task with ID=%s", db_task.id)
         return db_task
     except Exception as e:
         await db.rollback()
-        logger.error(f"Error creating task: {str(e)}")
+        logger.error("Error creating task: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
-async def update_task(db: AsyncSession, task_id: int, new_task: schemas.TaskUpdate):
-    logger.info(f"Updating task with ID={task_id}")
-    db_task = await get_task(db, task_id)
-    if not db_task:
-        logger.warning(f"Task with ID={task_id} not found")
-        return None
+async def update_task(db: AsyncSession, task_id: int, new_task: schemas.TaskUpdate | schemas.TaskPatch, if_match: str | None = None):
+    request_logger.info("Updating task with ID=%s", task_id)
+    if TASK_WRITE_COALESCING:
+        return await submit_write(_update_task, task_id, new_task, if_match)
+    try:
+        db_task = await _update_task(db, task_id, new_task, if_match)
+        if not db_task:
+            logger.warning("Task with ID=%s not found", task_id)
+            return None
+        await db.commit()
+        tasks_changed()
+        request_logger.info("Updated task with ID=%s", task_id)
+        return db_task
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error updating task: %s", e)
+        raise HTTPException(status_code=500, detail="Database error")
 
-    for key, value in new_task.model_dump(exclude_unset=True).items():
-        setattr(db_task, key, value)
 
+async def delete_task(db: AsyncSession, task_id: int, if_match: str | None = None):
+    request_logger.info("Deleting task with ID=%s", task_id)
+    if TASK_WRITE_COALESCING:
+        return await submit_write(_delete_task, task_id, if_match)
     try:
+        db_task = await _delete_task(db, task_id, if_match)
+        if not db_task:
+            logger.warning("Task with ID=%s not found", task_id)
+            return None
         await db.commit()
-        await db.refresh(db_task)
-        logger.info(f"Updated task with ID={task_id}")
+        tasks_changed()
+        request_logger.info("Deleted task with ID=%s", task_id)
         return db_task
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
         await db.rollback()
-        logger.error(f"Error updating task: {str(e)}")
+        logger.error("Error deleting task: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
-async def delete_task(db: AsyncSession, task_id: int):
-    logger.info(f"Deleting task with ID={task_id}")
-    db_task = await get_task(db, task_id)
-    if not db_task:
-        logger.warning(f"Task with ID={task_id} not found")
-        return None
 
+async def insert_task_rows(db: AsyncSession, rows: list[dict]):
+    request_logger.info("Inserting batch of %s tasks", len(rows))
     try:
-        await db.delete(db_task)
+        # No RETURNING, so the driver runs a single executemany for the whole batch
+        await db.execute(insert(Task), rows)
         await db.commit()
-        logger.info(f"Deleted task with ID={task_id}")
-        return db_task
+        tasks_changed()
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error inserting task batch: %s", e)
+        raise HTTPException(status_code=500, detail="Database error")
+
+
+async def create_tasks(db: AsyncSession, new_tasks: list[schemas.TaskCreate]):
+    request_logger.info("Bulk creating %s tasks", len(new_tasks))
+    if not new_tasks:
+        return []
+    try:
+        result = await db.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            [new_task.model_dump() for new_task in new_tasks]
+        )
+        db_tasks = result.all()
+        await db.commit()
+        tasks_changed()
+        request_logger.info("Bulk created %s tasks", len(db_tasks))
+        return db_tasks
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error bulk creating tasks: %s", e)
+        raise HTTPException(status_code=500, detail="Database error")
+
+
+async def update_tasks(db: AsyncSession, new_tasks: list[schemas.TaskBulkUpdate]):
+    request_logger.info("Bulk updating %s tasks", len(new_tasks))
+    try:
+        existing = await _get_tasks_by_ids(db, [new_task.id for new_task in new_tasks])
+        rows = [new_task.model_dump(exclude_unset=True) | {"id": new_task.id} for new_task in new_tasks if new_task.id in existing]
+        if rows:
+            await db.execute(update(Task), rows)
+        await db.commit()
+        tasks_changed()
+        updated = await _get_tasks_by_ids(db, list(existing)) if rows else {}
+        request_logger.info("Bulk updated %s tasks", len(rows))
+        return [updated.get(new_task.id) for new_task in new_tasks]
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error bulk updating tasks: %s", e)
+        raise HTTPException(status_code=500, detail="Database error")
+
+
+async def delete_tasks(db: AsyncSession, task_ids: list[int]):
+    request_logger.info("Bulk deleting %s tasks", len(task_ids))
+    try:
+        existing = await _get_tasks_by_ids(db, task_ids)
+        for chunk in _chunked(list(existing)):
+            await db.execute(tombstones_for(chunk))
+            await db.execute(delete(Task).where(Task.id.in_(chunk)))
+        await db.commit()
+        tasks_changed()
+        request_logger.info("Bulk deleted %s tasks", len(existing))
+        return [existing.get(task_id) for task_id in task_ids]
     except Exception as e:
         await db.rollback()
-        logger.error(f"Error deleting task: {str(e)}")
+        logger.error("Error bulk deleting tasks: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
@@ -1,37 +1,63 @@
-from app.core.logging_config import logger
+from app.core.logging_config import logger, request_logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from app.models.user import User
-from app.utils import hash_password
+from app.utils import hash_password, run_in_hash_pool
+from app.core.cache import invalidate_principal
+from app.core.singleflight import SingleFlight
+from app.config import SINGLE_FLIGHT_ENABLED
 from fastapi import HTTPException
 
 
+# Concurrent logins and token checks for one username share a single lookup
+user_reads = SingleFlight("get_user_by_username", SINGLE_FLIGHT_ENABLED)
+
+
 async def get_user_by_username(db: AsyncSession, username: str):
-    logger.info(f"Fetching user with username={username}")
+    request_logger.info("Fetching user with username=%s", username)
+    return await user_reads.do(username, lambda: _get_user_by_username(db, username))
+
+
+# Uncoalesced, for the uniqueness check inside create_user's own transaction
+async def _get_user_by_username(db: AsyncSession, username: str):
     try:
         result = await db.execute(select(User).where(User.username == username))
         return result.scalar_one_or_none()
     except Exception as e:
-        logger.error(f"Error fetching user: {str(e)}")
+        logger.error("Error fetching user: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
+def username_taken(username: str):
+    logger.warning("User with username=%s already exists", username)
+    raise HTTPException(status_code=400, detail="Username already taken")
+
+
 async def create_user(db: AsyncSession, username: str, password: str):
-    existing_user = await get_user_by_username(db, username)
-    if existing_user:
-        logger.warning(f"User with username={username} already exists")
-        raise HTTPException(status_code=400, detail="Username already taken")
+    # Checked before hashing, so a duplicate registration never costs a bcrypt run
+    if await _get_user_by_username(db, username):
+        username_taken(username)
+    # Ends the read so the write connection is not held while bcrypt runs
+    await db.rollback()
+    hashed_pwd = await run_in_hash_pool(hash_password, password)
 
-    hashed_pwd = hash_password(password)
     db_user = User(username=username, hashed_password=hashed_pwd)
     db.add(db_user)
 
     try:
         await db.commit()
         await db.refresh(db_user)
-        logger.info(f"User {username} successfully created")
+        # A re-created username must never resolve to a principal cached for the old row
+        invalidate_principal(username)
+        user_reads.forget(username)
+        logger.info("User %s successfully created", username)
         return db_user
+    except IntegrityError:
+        # Registered by a concurrent request between the check and the insert; the unique index decides
+        await db.rollback()
+        username_taken(username)
     except Exception as e:
         await db.rollback()
-        logger.error(f"Error creating user: {str(e)}")
+        logger.error("Error creating user: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
\ No newline at end of file
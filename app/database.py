@@ -1,35 +1,203 @@
-from app.core.logging_config import logger
+from app.core.logging_config import logger, request_logger
 from app.models import Base
+from app.models.task import Task
+from app.search import create_search_index
+from sqlalchemy import event, text, inspect
+from sqlalchemy.schema import CreateColumn, CreateTable
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from app.config import SQLALCHEMY_DATABASE_URL
+from app.core.metrics import before_cursor_execute, after_cursor_execute, db_sessions_total
+from app.config import Settings, SQLITE_PRAGMAS
 
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL)
+# Bump whenever models, indexes or the search schema change, so init_db applies them on the next boot
+SCHEMA_VERSION = 4
 
 
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    expire_on_commit=False,
-    class_=AsyncSession,
-    future=True
-)
-logger.info("Async sessionmaker created")
+def apply_pragmas(engine, pragmas: dict):
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_engines(url: str, profile: str = "tuned", pragmas: dict | None = None, read_pool_size: int = 8):
+    if profile != "tuned" or not url.startswith("sqlite") or ":memory:" in url:
+        engine = create_async_engine(url)
+        return engine, engine
+
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+    # SQLite allows one writer at a time, so mutations queue on a single connection instead of
+    # fighting over the database lock, while reads run in parallel on their own read-only pool
+    write_engine = create_async_engine(url, pool_size=1, max_overflow=0)
+    read_engine = create_async_engine(url, pool_size=read_pool_size, max_overflow=0)
+    apply_pragmas(write_engine, pragmas)
+    apply_pragmas(read_engine, {name: value for name, value in pragmas.items() if name not in ("auto_vacuum", "journal_mode")} | {"query_only": "ON"})
+    return write_engine, read_engine
+
+
+def instrument_engine(engine):
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+# Engines and sessionmakers are built on first use rather than at import, so importing the app stays cheap
+_settings = Settings()
+_engines = None
+_sessionmakers = None
+
+
+def configure_database(settings: Settings):
+    global _settings, _engines, _sessionmakers
+    _settings = settings
+    _engines = None
+    _sessionmakers = None
+
+
+def get_engines():
+    global _engines
+    if _engines is None:
+        _engines = create_engines(_settings.database_url, _settings.sqlite_engine_profile, _settings.sqlite_pragmas, _settings.sqlite_read_pool_size)
+        for instrumented_engine in set(_engines):
+            instrument_engine(instrumented_engine)
+        logger.info("Database engines created with the %s profile", _settings.sqlite_engine_profile)
+    return _engines
+
+
+def get_sessionmakers():
+    global _sessionmakers
+    if _sessionmakers is None:
+        _sessionmakers = tuple(
+            async_sessionmaker(bind=bound_engine, expire_on_commit=False, class_=AsyncSession, future=True)
+            for bound_engine in get_engines()
+        )
+        logger.info("Async sessionmaker created")
+    return _sessionmakers
+
+
+async def dispose_engines():
+    global _engines, _sessionmakers
+    if _engines is not None:
+        for created_engine in set(_engines):
+            await created_engine.dispose()
+    _engines = None
+    _sessionmakers = None
+
+
+def AsyncSessionLocal():
+    return get_sessionmakers()[0]()
+
+
+def AsyncSessionReadLocal():
+    return get_sessionmakers()[1]()
+
+
+def __getattr__(name):
+    if name == "engine":
+        return get_engines()[0]
+    if name == "read_engine":
+        return get_engines()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def create_missing_indexes(sync_conn):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
+def add_missing_columns(sync_conn):
+    # create_all never alters existing tables, so columns added to a model later are added here
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                logger.info("Adding column %s.%s", table.name, column.name)
+                sync_conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {CreateColumn(column).compile(dialect=sync_conn.dialect)}"))
+
+
+def use_autoincrement_task_ids(sync_conn):
+    # Without AUTOINCREMENT SQLite hands out max(id) + 1, reusing the ids of deleted and archived tasks.
+    # It can only be switched on by rebuilding the table; ids are copied, so the search index stays valid
+    if sync_conn.dialect.name != "sqlite":
+        return
+    table_sql = sync_conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tasks'")).scalar()
+    if "AUTOINCREMENT" in table_sql.upper():
+        return
+    logger.info("Rebuilding the tasks table with AUTOINCREMENT ids")
+    columns = ", ".join(column.name for column in Task.__table__.columns)
+    create_table = str(CreateTable(Task.__table__).compile(dialect=sync_conn.dialect))
+    sync_conn.execute(text(create_table.replace("CREATE TABLE tasks", "CREATE TABLE tasks_rebuild", 1)))
+    sync_conn.execute(text(f"INSERT INTO tasks_rebuild ({columns}) SELECT {columns} FROM tasks"))
+    sync_conn.execute(text("DROP TABLE tasks"))
+    sync_conn.execute(text("ALTER TABLE tasks_rebuild RENAME TO tasks"))
+    # Ids already given to tasks that were since deleted or archived are not handed out again either
+    sync_conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'tasks'"))
+    sync_conn.execute(text(
+        "INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', max("
+        "(SELECT coalesce(max(id), 0) FROM tasks), "
+        "(SELECT coalesce(max(id), 0) FROM tasks_archive), "
+        "(SELECT coalesce(max(task_id), 0) FROM task_tombstones)))"
+    ))
+
+
+def backfill_task_revisions(sync_conn):
+    # Tasks written before the change feed existed get distinct revisions, so a full sync from 0 returns them
+    sync_conn.execute(text("UPDATE tasks SET revision = id WHERE revision = 0"))
+
+
+def get_schema_version(sync_conn) -> int:
+    return sync_conn.execute(text("PRAGMA user_version")).scalar()
+
+
+def create_schema(sync_conn):
+    Base.metadata.create_all(sync_conn)
+    add_missing_columns(sync_conn)
+    use_autoincrement_task_ids(sync_conn)
+    backfill_task_revisions(sync_conn)
+    # create_all skips indexes of tables that already exist, so indexes added later are created here
+    create_missing_indexes(sync_conn)
+    create_search_index(sync_conn)
 
 
 async def init_db():
     logger.info("Initializing the database schema...")
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    async with get_engines()[0].begin() as conn:
+        if conn.dialect.name != "sqlite":
+            await conn.run_sync(create_schema)
+        else:
+            # Workers boot together; holding the write lock makes them check and apply the schema one at a time
+            await conn.exec_driver_sql("BEGIN IMMEDIATE")
+            # user_version lives in the SQLite header, so a current schema is confirmed without reflecting any table
+            if await conn.run_sync(get_schema_version) == SCHEMA_VERSION:
+                logger.info("Database schema is at version %s, nothing to do", SCHEMA_VERSION)
+                return
+            await conn.run_sync(create_schema)
+            await conn.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
     logger.info("Database initialized successfully")
 
 
 async def get_db():
-    logger.info("Opening async database session")
+    request_logger.info("Opening async database session")
+    db_sessions_total.inc("write", "open")
     async with AsyncSessionLocal() as db:
         try:
             yield db
         finally:
             await db.close()
-            logger.info("Database session closed")
+            db_sessions_total.inc("write", "close")
+            request_logger.info("Database session closed")
 
 
+async def get_read_db():
+    request_logger.info("Opening async read-only database session")
+    db_sessions_total.inc("read", "open")
+    async with AsyncSessionReadLocal() as db:
+        try:
+            yield db
+        finally:
+            await db.close()
+            db_sessions_total.inc("read", "close")
+            request_logger.info("Read-only database session closed")
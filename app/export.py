@@ -0,0 +1,54 @@
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import datetime
+
+
+EXPORT_FIELDS = ["id", "title", "description", "status", "created_at", "updated_at"]
+
+
+def _export_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def ndjson_chunks(rows, chunk_rows: int):
+    lines = []
+    async for row in rows:
+        lines.append(json.dumps({field: _export_value(row[field]) for field in EXPORT_FIELDS}))
+        if len(lines) >= chunk_rows:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def csv_chunks(rows, chunk_rows: int):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    pending = 0
+    async for row in rows:
+        writer.writerow([_export_value(row[field]) for field in EXPORT_FIELDS])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
+
+
+async def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        # Sync flush so every chunk reaches the client as soon as it is produced
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
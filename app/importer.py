@@ -0,0 +1,133 @@
+import codecs
+import csv
+import json
+import time
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas
+from app.core.logging_config import logger
+from app.crud.task import insert_task_rows
+from app.config import TASKS_IMPORT_MAX_LINE_LENGTH
+
+
+def line_too_long(max_line_length: int) -> ValueError:
+    return ValueError(f"Line is longer than {max_line_length} characters")
+
+
+async def iter_lines(byte_chunks, max_line_length: int):
+    # Yields each line, or a ValueError in its place for a line over max_line_length, so one huge
+    # line without a newline is never held in memory
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    skipping = False
+    async for chunk in byte_chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if skipping:
+                # The end of a line already reported as too long
+                skipping = False
+                continue
+            yield line.rstrip("\r") if len(line) <= max_line_length else line_too_long(max_line_length)
+        if len(pending) > max_line_length:
+            if not skipping:
+                yield line_too_long(max_line_length)
+            skipping = True
+            pending = ""
+    pending += decoder.decode(b"", final=True)
+    if pending and not skipping:
+        yield pending.rstrip("\r") if len(pending) <= max_line_length else line_too_long(max_line_length)
+
+
+async def ndjson_records(lines):
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if isinstance(line, Exception):
+            yield line_number, line
+            continue
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, e
+
+
+async def csv_records(lines):
+    header = None
+    record_lines = []
+    quotes = 0
+    line_number = 0
+    start_line = 0
+    async for line in lines:
+        line_number += 1
+        if not record_lines:
+            start_line = line_number
+        if isinstance(line, Exception):
+            # The record the line belongs to is dropped as a whole
+            yield start_line, line
+            record_lines = []
+            quotes = 0
+            continue
+        record_lines.append(line)
+        quotes += line.count('"')
+        # Quotes inside a field are doubled, so an odd count means a quoted newline continues the record
+        if quotes % 2:
+            continue
+        record = "\n".join(record_lines)
+        record_lines = []
+        quotes = 0
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = values
+            continue
+        if len(values) != len(header):
+            yield start_line, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        yield start_line, {key: value or None for key, value in zip(header, values)}
+    if record_lines:
+        yield start_line, ValueError("Unterminated quoted field")
+
+
+async def import_tasks(db: AsyncSession, byte_chunks, import_format: str, batch_size: int, max_reported_errors: int, max_line_length: int = TASKS_IMPORT_MAX_LINE_LENGTH):
+    started = time.perf_counter()
+    lines = iter_lines(byte_chunks, max_line_length)
+    records = ndjson_records(lines) if import_format == "ndjson" else csv_records(lines)
+    total = inserted = rejected = 0
+    errors = []
+    batch = []
+
+    async for line, record in records:
+        total += 1
+        try:
+            if isinstance(record, Exception):
+                raise record
+            batch.append(schemas.TaskCreate.model_validate(record).model_dump())
+        except (ValueError, TypeError, ValidationError) as e:
+            rejected += 1
+            if len(errors) < max_reported_errors:
+                errors.append(schemas.TaskImportError(line=line, detail=str(e)))
+            continue
+        if len(batch) >= batch_size:
+            await insert_task_rows(db, batch)
+            inserted += len(batch)
+            batch = []
+
+    if batch:
+        await insert_task_rows(db, batch)
+        inserted += len(batch)
+
+    elapsed = time.perf_counter() - started
+    logger.info("Imported %s tasks, rejected %s, in %.2fs", inserted, rejected, elapsed)
+    return schemas.TaskImportSummary(
+        format=import_format,
+        total_records=total,
+        inserted=inserted,
+        rejected=rejected,
+        errors=errors,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(inserted / elapsed, 1) if elapsed else 0.0
+    )
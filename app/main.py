@@ -1,27 +1,51 @@
-from app.core.logging_config import logger
+from app.core.logging_config import logger, configure_logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.database import init_db
+from app.config import Settings, TASK_ARCHIVE_ENABLED
+from app.config import COMPRESSION_ENABLED, COMPRESSION_MINIMUM_SIZE, COMPRESSION_LEVELS, COMPRESSION_PREFERENCE
+from app.database import init_db, configure_database, dispose_engines
+from app.utils import shutdown_hash_pool
+from app.core.write_queue import task_write_queue
+from app.archive import task_archiver
 from app.api.auth import auth_router
 from app.api.task import task_router
+from app.api.metrics import metrics_router
+from app.core.middleware import RequestIdMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.core.compression import CompressionMiddleware
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Log handlers and the database are set up when a worker starts serving, not when the module is imported
+    configure_logging()
     logger.info("Application started...")
     await init_db()
+    if TASK_ARCHIVE_ENABLED:
+        task_archiver.start()
     yield
+    await task_archiver.stop()
+    await task_write_queue.stop()
+    shutdown_hash_pool()
+    await dispose_engines()
     logger.info("Aplication finished...")
 
 
-app = FastAPI(lifespan=lifespan)
-
-
-app.include_router(auth_router)
-app.include_router(task_router)
-
-
+def create_app(settings: Settings | None = None) -> FastAPI:
+    settings = settings or Settings()
+    configure_database(settings)
 
+    app = FastAPI(lifespan=lifespan)
+    app.state.settings = settings
+    if COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE, levels=COMPRESSION_LEVELS, preference=COMPRESSION_PREFERENCE)
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(RequestIdMiddleware)
 
+    app.include_router(auth_router)
+    app.include_router(task_router)
+    app.include_router(metrics_router)
+    return app
 
 
+app = create_app()
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, Enum
+from sqlalchemy import Column, Integer, String, DateTime, func, Enum, Index, select, case, table, column
+from sqlalchemy.dialects import sqlite
 from app.models import Base
 import enum
 
@@ -9,15 +10,75 @@ class TaskStatus(str, enum.Enum):
     closed = "closed"
 
 
+# SQLite stores timestamps as text; binding datetimes in the same format func.now() writes
+# keeps range filters and keyset comparisons on these columns correct
+Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite"
+)
+
+
+def latest_revision():
+    # Highest revision handed out so far; deleted tasks keep theirs in the tombstones table
+    tasks_max = select(func.coalesce(func.max(column("revision")), 0)).select_from(table("tasks")).scalar_subquery()
+    tombstones_max = select(func.coalesce(func.max(column("revision")), 0)).select_from(table("task_tombstones")).scalar_subquery()
+    return case((tasks_max > tombstones_max, tasks_max), else_=tombstones_max)
+
+
+def next_revision():
+    # Evaluated by the database inside each write; writers hold the database lock until they
+    # commit, so revisions grow in commit order
+    return latest_revision() + 1
+
+
 class Task(Base):
     __tablename__ = 'tasks'
 
     id = Column(Integer, primary_key=True)
-    title = Column(String, nullable=False)
+    title = Column(String, nullable=False, index=True)
     description = Column(String)
-    status = Column(Enum(TaskStatus), default=TaskStatus.open)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    status = Column(Enum(TaskStatus), default=TaskStatus.open, index=True)
+    created_at = Column(Timestamp, default=func.now(), index=True)
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now(), index=True)
+    revision = Column(Integer, nullable=False, default=next_revision(), onupdate=next_revision(), server_default="0", index=True)
+
+    # Status leads each composite index, so a status filter is served by the same index as the sort.
+    # AUTOINCREMENT keeps ids of deleted and archived tasks from ever being handed out again
+    __table_args__ = (
+        Index("ix_tasks_status_created_at", "status", "created_at"),
+        Index("ix_tasks_status_updated_at", "status", "updated_at"),
+        Index("ix_tasks_status_title", "status", "title"),
+        {"sqlite_autoincrement": True},
+    )
 
     def __repr__(self):
         return f"<Task(id={self.id}, title={self.title}', status={self.status}')>"
+
+
+class TaskTombstone(Base):
+    __tablename__ = 'task_tombstones'
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False)
+    revision = Column(Integer, nullable=False, default=next_revision(), index=True)
+    deleted_at = Column(Timestamp, default=func.now())
+
+    def __repr__(self):
+        return f"<TaskTombstone(task_id={self.task_id}, revision={self.revision})>"
+
+
+class ArchivedTask(Base):
+    # Closed tasks moved out of the hot table by app.archive; same columns, ids kept (task ids are never reused)
+    __tablename__ = 'tasks_archive'
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String, nullable=False)
+    description = Column(String)
+    status = Column(Enum(TaskStatus), nullable=False)
+    created_at = Column(Timestamp)
+    updated_at = Column(Timestamp)
+    revision = Column(Integer, nullable=False)
+    archived_at = Column(Timestamp, default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<ArchivedTask(id={self.id}, title={self.title}', status={self.status}')>"
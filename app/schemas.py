@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
+from typing import Literal
 from app.models.task import TaskStatus
 
 
@@ -29,6 +30,35 @@ class TaskUpdate(TaskBase):
     pass
 
 
+class TaskPatch(BaseModel):
+    title: str | None = Field(
+        None,
+        min_length=3,
+        max_length=255,
+        description="Title must be between 3 and 255 characters."
+    )
+    description: str | None = Field(
+        None,
+        max_length=1000,
+        description="The maximum length of the description is 1000 characters."
+    )
+    status: TaskStatus | None = Field(
+        None,
+        description="Allowed statuses are: open, in_progress, closed."
+    )
+
+    @field_validator("title", "status")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("Field may be omitted but not set to null")
+        return value
+
+
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+
 class TaskResponse(TaskBase):
     id: int
     created_at: datetime
@@ -38,6 +68,46 @@ class TaskResponse(TaskBase):
         from_attributes = True
 
 
+class TaskBulkResult(BaseModel):
+    index: int
+    id: int | None = None
+    status: Literal["created", "updated", "deleted", "found", "not_found", "invalid"]
+    task: TaskResponse | None = None
+    detail: str | None = None
+
+
+class TaskSearchResult(TaskResponse):
+    score: float
+    title_highlight: str
+    snippet: str | None = None
+
+
+class TaskChanges(BaseModel):
+    # Next `since`; clients apply `deleted` before `changes`
+    revision: int
+    changes: list[TaskResponse]
+    deleted: list[int]
+
+
+TaskSortField = Literal["id", "created_at", "updated_at", "title"]
+SortOrder = Literal["asc", "desc"]
+
+
+class TaskImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class TaskImportSummary(BaseModel):
+    format: str
+    total_records: int
+    inserted: int
+    rejected: int
+    errors: list[TaskImportError]
+    elapsed_seconds: float
+    rows_per_second: float
+
+
 class User(BaseModel):
     username: str = Field(
         ...,
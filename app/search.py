@@ -0,0 +1,104 @@
+import re
+from sqlalchemy import column, func, literal_column, table, text
+from app.core.logging_config import logger
+
+
+class InvalidSearchQuery(ValueError):
+    pass
+
+
+# External-content FTS5 index: it stores only the inverted index and reads title/description back from tasks
+SEARCH_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+tasks_fts = table("tasks_fts", column("rowid"))
+fts_table = literal_column("tasks_fts")
+
+TERM_PATTERN = re.compile(r"\w+\*?")
+
+
+def build_match_query(q: str) -> str:
+    # Only word characters reach MATCH, so user input can never inject FTS5 query syntax
+    terms = []
+    for term in TERM_PATTERN.findall(q):
+        word = term.rstrip("*")
+        terms.append(f'"{word}"*' if term.endswith("*") else f'"{word}"')
+    if not terms:
+        raise InvalidSearchQuery(q)
+    return " ".join(terms)
+
+
+def search_hits(match: str, title_weight: float, description_weight: float, snippet_tokens: int, mark: tuple[str, str]):
+    return (
+        tasks_fts.select()
+        .with_only_columns(
+            tasks_fts.c.rowid.label("id"),
+            func.bm25(fts_table, title_weight, description_weight).label("score"),
+            func.highlight(fts_table, 0, *mark).label("title_highlight"),
+            func.snippet(fts_table, 1, *mark, "…", snippet_tokens).label("snippet"),
+        )
+        .where(fts_table.op("MATCH")(match))
+        .subquery("hits")
+    )
+
+
+def search_index_exists(sync_conn) -> bool:
+    return sync_conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'")).first() is not None
+
+
+def rebuild_search_index(sync_conn):
+    sync_conn.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+    logger.info("Task search index rebuilt")
+
+
+def create_search_index(sync_conn):
+    if sync_conn.dialect.name != "sqlite":
+        logger.warning("Full-text search needs SQLite FTS5, skipping the search index")
+        return
+    existed = search_index_exists(sync_conn)
+    for statement in SEARCH_SCHEMA:
+        sync_conn.execute(text(statement))
+    # Rows written before the index existed are only picked up by a rebuild
+    if not existed:
+        rebuild_search_index(sync_conn)
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    from app.core.logging_config import configure_logging
+    from app.database import get_engines, dispose_engines
+
+    parser = argparse.ArgumentParser(description="Manage the task full-text search index")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+    configure_logging()
+
+    async def main():
+        async with get_engines()[0].begin() as conn:
+            await conn.run_sync(create_search_index)
+            await conn.run_sync(rebuild_search_index)
+        await dispose_engines()
+
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+from datetime import datetime
+from operator import itemgetter
+from typing import Any
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from app import schemas
+
+try:
+    import orjson
+except ImportError:  # optional, pydantic-core encodes the rows otherwise
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional, application/msgpack is not offered without it
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # optional, application/cbor is not offered without it
+    cbor2 = None
+
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CBOR = "application/cbor"
+MEDIA_TYPE_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.msgpack": MSGPACK}
+
+TASK_RESPONSE_FIELDS = tuple(schemas.TaskResponse.model_fields)
+TASK_DATETIME_FIELDS = tuple(name for name, info in schemas.TaskResponse.model_fields.items() if info.annotation is datetime)
+task_list_adapter = TypeAdapter(list[schemas.TaskResponse])
+task_row_adapter = TypeAdapter(list[dict[str, Any]])
+
+
+def available_media_types() -> list[str]:
+    # In order of preference when the client accepts several equally
+    return [JSON] + [media_type for media_type, module in ((MSGPACK, msgpack), (CBOR, cbor2)) if module is not None]
+
+
+def negotiate_media_type(accept: str | None) -> str:
+    if not accept:
+        return JSON
+    ranges = []
+    for part in accept.split(","):
+        media_range, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_range = media_range.strip().lower()
+        ranges.append((MEDIA_TYPE_ALIASES.get(media_range, media_range), quality))
+
+    best, best_score = JSON, None
+    for preference, media_type in enumerate(available_media_types()):
+        # The most specific matching range decides the quality: exact type, then type/*, then */*
+        matches = [
+            (specificity, quality) for media_range, quality in ranges
+            for specificity, pattern in ((2, media_type), (1, media_type.split("/")[0] + "/*"), (0, "*/*"))
+            if media_range == pattern
+        ]
+        if not matches:
+            continue
+        specificity, quality = max(matches)
+        score = (quality, specificity, -preference)
+        if quality > 0 and (best_score is None or score > best_score):
+            best, best_score = media_type, score
+    # Accept is advisory: a client that only lists unsupported types still gets JSON
+    return best
+
+
+def dump_payload(payload, media_type: str = JSON) -> bytes:
+    # payload holds JSON-compatible values only, so every format carries the same data
+    if media_type == MSGPACK:
+        return msgpack.packb(payload)
+    if media_type == CBOR:
+        return cbor2.dumps(payload)
+    return orjson.dumps(payload) if orjson is not None else to_json(payload)
+
+
+def dump_tasks(db_tasks, media_type: str = JSON) -> bytes:
+    validated = task_list_adapter.validate_python(db_tasks, from_attributes=True)
+    if media_type != JSON:
+        return dump_payload(task_list_adapter.dump_python(validated, mode="json"), media_type)
+    return task_list_adapter.dump_json(validated)
+
+
+def task_row_dicts(rows) -> list[dict]:
+    if not rows:
+        return []
+    # Positional access, reordered to the TaskResponse field order, is far cheaper than per-key row lookups
+    columns = rows[0]._fields
+    values = itemgetter(*(columns.index(field) for field in TASK_RESPONSE_FIELDS))
+    return [dict(zip(TASK_RESPONSE_FIELDS, values(row))) for row in rows]
+
+
+def with_iso_timestamps(payload: list[dict]) -> list[dict]:
+    # Binary formats get timestamps as the same ISO 8601 strings the JSON body carries
+    for item in payload:
+        for name in TASK_DATETIME_FIELDS:
+            item[name] = item[name].isoformat()
+    return payload
+
+
+def dump_task_rows(rows, media_type: str = JSON) -> bytes:
+    # Rows are read straight from the tasks table, so they are trusted and encoded without
+    # TaskResponse validation; the output is byte-for-byte the same as dump_tasks
+    if media_type != JSON:
+        return dump_payload(with_iso_timestamps(task_row_dicts(rows)), media_type)
+    if not rows:
+        return b"[]"
+    payload = task_row_dicts(rows)
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return task_row_adapter.dump_json(payload)
+
+
+def dump_task_changes(revision: int, rows, deleted: list[int], media_type: str = JSON) -> bytes:
+    if media_type != JSON:
+        return dump_payload({"revision": revision, "changes": with_iso_timestamps(task_row_dicts(rows)), "deleted": deleted}, media_type)
+    # The same bytes as TaskChanges.model_dump_json, with the changed rows on the fast path
+    deleted_json = b",".join(b"%d" % task_id for task_id in deleted)
+    return b'{"revision":%d,"changes":%b,"deleted":[%b]}' % (revision, dump_task_rows(rows), deleted_json)
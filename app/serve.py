@@ -0,0 +1,53 @@
+import argparse
+import importlib.util
+import os
+import uvicorn
+from app.core.logging_config import logger, configure_logging
+from app.config import PORT, SERVER_HOST, SERVER_WORKERS, SERVER_BACKLOG, SERVER_KEEP_ALIVE_SECONDS
+from app.config import SERVER_LIMIT_CONCURRENCY, SERVER_GRACEFUL_SHUTDOWN_SECONDS, SERVER_ACCESS_LOG
+
+
+def available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def worker_count(requested: int = 0) -> int:
+    return requested if requested > 0 else os.cpu_count() or 1
+
+
+def build_config(workers: int = 0, host: str = SERVER_HOST, port: int = PORT) -> dict:
+    return {
+        # Each worker process imports the factory and builds its own app, engines and pools
+        "app": "app.main:create_app",
+        "factory": True,
+        "host": host,
+        "port": port,
+        "workers": worker_count(workers),
+        "loop": "uvloop" if available("uvloop") else "asyncio",
+        "http": "httptools" if available("httptools") else "h11",
+        "backlog": SERVER_BACKLOG,
+        "timeout_keep_alive": SERVER_KEEP_ALIVE_SECONDS,
+        "limit_concurrency": SERVER_LIMIT_CONCURRENCY,
+        # On SIGTERM uvicorn stops accepting, lets in-flight requests finish within this window and then
+        # runs lifespan shutdown, which drains the write queue before the engines are disposed
+        "timeout_graceful_shutdown": SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        "access_log": SERVER_ACCESS_LOG,
+        "lifespan": "on",
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Run the API with multiple uvicorn workers")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="0 runs one worker per CPU")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    config = build_config(args.workers, args.host, args.port)
+    logger.info("Starting %s workers on %s:%s (loop=%s, http=%s)", config["workers"], args.host, args.port, config["loop"], config["http"])
+    uvicorn.run(**config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Measure request throughput with application logging enabled and disabled.
+
+Runs app.main:app in-process through the httpx ASGI transport against a temporary SQLite file.
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_logging --requests 2000 --concurrency 16
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+
+async def run(client, headers, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            response = await client.get(f"/tasks/{i % 100 + 1}", headers=headers)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int, concurrency: int):
+    import httpx
+    from app.main import app, lifespan
+
+    async with lifespan(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            await client.post("/auth/register", json={"username": "bench", "password": "benchpassword"})
+            token = (await client.post("/auth/login", data={"username": "bench", "password": "benchpassword"})).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            await client.post("/tasks/bulk", json=[{"title": f"Task {i}", "status": "open"} for i in range(100)], headers=headers)
+            await run(client, headers, 200, concurrency)
+
+            logging.getLogger("httpx").setLevel(logging.WARNING)
+            enabled = await run(client, headers, requests, concurrency)
+            logging.disable(logging.CRITICAL)
+            disabled = await run(client, headers, requests, concurrency)
+            logging.disable(logging.NOTSET)
+
+    print(f"{'logging':>10} {'req/s':>10}")
+    print(f"{'on':>10} {enabled:>10.1f}")
+    print(f"{'off':>10} {disabled:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        asyncio.run(main(args.requests, args.concurrency))
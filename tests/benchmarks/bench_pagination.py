@@ -0,0 +1,70 @@
+"""Compare OFFSET and keyset (cursor) pagination latency across page depth.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_pagination --rows 1000000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app.core.logging_config import logger
+from app.crud.task import get_tasks
+from app.models import Base
+from app.models.task import Task, TaskStatus
+
+
+async def seed(session_factory, rows: int, batch_size: int = 10000):
+    async with session_factory() as db:
+        for start in range(0, rows, batch_size):
+            batch = [
+                {"title": f"Task {i}", "description": "benchmark", "status": TaskStatus.open}
+                for i in range(start, min(start + batch_size, rows))
+            ]
+            await db.execute(insert(Task), batch)
+        await db.commit()
+
+
+async def time_page(session_factory, repeat: int, **kwargs) -> float:
+    samples = []
+    async with session_factory() as db:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await get_tasks(db, **kwargs)
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+async def main(rows: int, limit: int, repeat: int):
+    logger.setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await seed(session_factory, rows)
+
+        depths = sorted({0, rows // 100, rows // 10, rows // 2, max(rows - limit, 0)})
+        print(f"{'depth':>10} {'offset ms':>12} {'cursor ms':>12}")
+        for depth in depths:
+            offset_ms = await time_page(session_factory, repeat, skip=depth, limit=limit)
+            # ids are contiguous from 1, so after_id=depth returns the same page as skip=depth
+            cursor_ms = await time_page(session_factory, repeat, after_id=depth, limit=limit)
+            print(f"{depth:>10} {offset_ms:>12.3f} {cursor_ms:>12.3f}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.limit, args.repeat))
@@ -0,0 +1,84 @@
+"""Compare the cost of producing one GET /tasks page with the standard and fast serialisers.
+
+standard: ORM entities, TaskResponse validation (from_attributes), pydantic-core JSON
+fast:     column tuples, no re-validation, orjson (or pydantic-core when orjson is missing)
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_serialization --limit 100
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app import serialization
+from app.core.logging_config import logger, request_logger
+from app.crud.task import get_tasks
+from app.models import Base
+from app.models.task import Task, TaskStatus
+
+
+async def seed(session_factory, rows: int):
+    async with session_factory() as db:
+        await db.execute(insert(Task), [
+            {"title": f"Task {i}", "description": "benchmark " * 8, "status": TaskStatus.open}
+            for i in range(rows)
+        ])
+        await db.commit()
+
+
+async def time_path(session_factory, repeat: int, limit: int, as_rows: bool, encode) -> tuple[float, float]:
+    query_samples, encode_samples = [], []
+    async with session_factory() as db:
+        for _ in range(repeat // 10):
+            encode(await get_tasks(db, limit=limit, as_rows=as_rows))
+        for _ in range(repeat):
+            started = time.perf_counter()
+            tasks = await get_tasks(db, limit=limit, as_rows=as_rows)
+            fetched = time.perf_counter()
+            encode(tasks)
+            query_samples.append(fetched - started)
+            encode_samples.append(time.perf_counter() - fetched)
+            db.expunge_all()
+    return statistics.median(query_samples) * 1e6, statistics.median(encode_samples) * 1e6
+
+
+async def main(limit: int, repeat: int):
+    logger.setLevel(logging.WARNING)
+    request_logger.setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await seed(session_factory, limit)
+
+        orjson = serialization.orjson
+        paths = [("standard", False, serialization.dump_tasks)]
+        if orjson is not None:
+            paths.append(("fast (orjson)", True, serialization.dump_task_rows))
+        serialization.orjson = None
+        paths.append(("fast (pydantic-core)", True, serialization.dump_task_rows))
+
+        print(f"{'path':<22} {'query us':>10} {'encode us':>10} {'total us':>10}")
+        for name, as_rows, encode in paths:
+            serialization.orjson = orjson if name == "fast (orjson)" else None
+            query_us, encode_us = await time_path(session_factory, repeat, limit, as_rows, encode)
+            print(f"{name:<22} {query_us:>10.1f} {encode_us:>10.1f} {query_us + encode_us:>10.1f}")
+        serialization.orjson = orjson
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.limit, args.repeat))
@@ -0,0 +1,88 @@
+"""Compare mixed read/write throughput of the "default" and "tuned" SQLite engine profiles.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_sqlite_profile --concurrency 32 --seconds 10
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.logging_config import logger
+from app.crud import task
+from app.database import create_engines
+from app.models import Base
+from app.models.task import Task, TaskStatus
+from app.schemas import TaskCreate, TaskUpdate
+
+
+async def worker(read_sessions, write_sessions, rows: int, write_ratio: float, deadline: float, counts: dict):
+    while time.perf_counter() < deadline:
+        try:
+            if random.random() < write_ratio:
+                async with write_sessions() as db:
+                    if random.random() < 0.5:
+                        await task.create_task(db, TaskCreate(title="benchmark task", status=TaskStatus.open))
+                    else:
+                        await task.update_task(db, random.randint(1, rows), TaskUpdate(title="updated task", status=TaskStatus.in_progress))
+                counts["writes"] += 1
+            else:
+                async with read_sessions() as db:
+                    if random.random() < 0.5:
+                        await task.get_tasks(db, after_id=random.randint(0, rows - 100), limit=100)
+                    else:
+                        await task.get_task(db, random.randint(1, rows))
+                counts["reads"] += 1
+        except HTTPException:
+            counts["errors"] += 1
+
+
+async def run_profile(profile: str, rows: int, concurrency: int, seconds: float, write_ratio: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        write_engine, read_engine = create_engines(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}", profile)
+        write_sessions = async_sessionmaker(bind=write_engine, expire_on_commit=False, class_=AsyncSession)
+        read_sessions = async_sessionmaker(bind=read_engine, expire_on_commit=False, class_=AsyncSession)
+        async with write_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with write_sessions() as db:
+            await db.execute(insert(Task), [{"title": f"Task {i}", "status": TaskStatus.open} for i in range(rows)])
+            await db.commit()
+
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*[
+            worker(read_sessions, write_sessions, rows, write_ratio, deadline, counts) for _ in range(concurrency)
+        ])
+        await write_engine.dispose()
+        await read_engine.dispose()
+
+    total = counts["reads"] + counts["writes"]
+    print(
+        f"{profile:>8} {total / seconds:>10.1f} {counts['reads'] / seconds:>10.1f} "
+        f"{counts['writes'] / seconds:>10.1f} {counts['errors']:>8}"
+    )
+
+
+async def main(rows: int, concurrency: int, seconds: float, write_ratio: float):
+    logger.setLevel(logging.WARNING)
+    print(f"{'profile':>8} {'ops/s':>10} {'reads/s':>10} {'writes/s':>10} {'errors':>8}")
+    for profile in ("default", "tuned"):
+        await run_profile(profile, rows, concurrency, seconds, write_ratio)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.concurrency, args.seconds, args.write_ratio))
@@ -0,0 +1,59 @@
+"""Measure worker cold start: importing app.main and running the lifespan startup.
+
+Each sample is a fresh interpreter, so module caches do not hide import cost. Startup is timed
+on a new database (schema created) and on one whose stored schema version is already current.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_startup --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app, lifespan
+imported = time.perf_counter()
+
+async def main():
+    begin = time.perf_counter()
+    async with lifespan(app):
+        ready = time.perf_counter()
+    print(json.dumps({"import_ms": (imported - started) * 1000, "startup_ms": (ready - begin) * 1000}))
+
+asyncio.run(main())
+"""
+
+
+def sample(database_url: str) -> dict:
+    env = os.environ | {"DATABASE_URL": database_url, "LOG_LEVEL": "WARNING"}
+    result = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, env=env, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(runs: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        fresh, current = [], []
+        for run in range(runs):
+            url = f"sqlite+aiosqlite:///{os.path.join(tmp, f'bench{run}.db')}"
+            fresh.append(sample(url))
+            current.append(sample(url))
+
+    print(f"{'database':>10} {'import ms':>10} {'startup ms':>11}")
+    for name, samples in (("new", fresh), ("current", current)):
+        import_ms = statistics.median(s["import_ms"] for s in samples)
+        startup_ms = statistics.median(s["startup_ms"] for s in samples)
+        print(f"{name:>10} {import_ms:>10.1f} {startup_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    main(args.runs)
@@ -0,0 +1,74 @@
+"""Payload size and encode time of a GET /tasks page per wire format and compression.
+
+Each page is read as column tuples (the fast path) and encoded as JSON, MessagePack and CBOR;
+every encoded body is then compressed with gzip, brotli and zstd at the levels configured in
+COMPRESSION_LEVELS. Formats and codecs whose optional package is missing are skipped.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_wire_formats --rows 100 1000
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from app import serialization
+from app.config import COMPRESSION_LEVELS
+from app.core.compression import available_codecs
+from app.core.logging_config import logger, request_logger
+from app.crud.task import get_tasks
+from app.models import Base
+from app.models.task import Task, TaskStatus
+
+
+def median_us(function, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+async def load_page(rows: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Task), [
+            {"title": f"Task {i}", "description": f"Benchmark task number {i} " * 3, "status": list(TaskStatus)[i % 3]}
+            for i in range(rows)
+        ])
+    async with async_sessionmaker(bind=engine, class_=AsyncSession)() as db:
+        page = await get_tasks(db, limit=rows, as_rows=True)
+    await engine.dispose()
+    return page
+
+
+async def main(row_counts: list[int], repeat: int):
+    logger.setLevel(logging.WARNING)
+    request_logger.setLevel(logging.WARNING)
+    codecs = available_codecs(COMPRESSION_LEVELS)
+    print(f"{'rows':>5} {'format':<20} {'encode us':>10} {'bytes':>9}  " + "  ".join(f"{name + ' bytes':>11} {name + ' us':>9}" for name in codecs))
+    for rows in row_counts:
+        page = await load_page(rows)
+        for media_type in serialization.available_media_types():
+            body = serialization.dump_task_rows(page, media_type)
+            encode_us = median_us(lambda: serialization.dump_task_rows(page, media_type), repeat)
+            compressed = "  ".join(
+                f"{len(codec.compress(body)):>11} {median_us(lambda: codec.compress(body), repeat):>9.1f}"
+                for codec in codecs.values()
+            )
+            print(f"{rows:>5} {media_type:<20} {encode_us:>10.1f} {len(body):>9}  {compressed}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
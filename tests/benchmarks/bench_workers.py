@@ -0,0 +1,93 @@
+"""Measure how throughput scales with the number of production server workers.
+
+Seeds a temporary SQLite database, starts `python -m app.serve --workers N` for each requested
+worker count and drives it from several client processes, since a single Python client saturates
+long before a multi-worker server does. Prints requests/sec and the worst client p95 per scenario.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_workers --workers 1 2 4 8 --clients 4
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from tests.benchmarks.load import BENCH_PASSWORD, free_port, run_scenario, scenarios, seed, wait_for_server
+
+
+def drive(base_url: str, token: str, scenario: str, tasks: int, requests: int, concurrency: int) -> dict:
+    async def run():
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            headers = {"Authorization": f"Bearer {token}"}
+            started = time.perf_counter()
+            result = await run_scenario(client, scenarios(tasks)[scenario], requests, concurrency, headers)
+            return result | {"elapsed": time.perf_counter() - started}
+
+    return asyncio.run(run())
+
+
+async def login(base_url: str) -> str:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        response = await client.post("/auth/login", data={"username": "user0", "password": BENCH_PASSWORD})
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+
+def measure(workers: int, args, env: dict) -> dict:
+    port = free_port()
+    server = subprocess.Popen([sys.executable, "-m", "app.serve", "--workers", str(workers), "--port", str(port)], env=env)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        asyncio.run(wait_for_server(base_url, timeout=60))
+        token = asyncio.run(login(base_url))
+        results = {}
+        with ProcessPoolExecutor(args.clients) as pool:
+            for scenario in args.scenarios:
+                per_client = args.requests // args.clients
+                runs = list(pool.map(drive, *zip(*[(base_url, token, scenario, args.tasks, per_client, args.concurrency)] * args.clients)))
+                results[scenario] = {
+                    "requests_per_second": round(sum(run["requests"] for run in runs) / max(run["elapsed"] for run in runs), 1),
+                    "p95_ms": max(run["p95_ms"] for run in runs),
+                    "errors": sum(run["errors"] for run in runs),
+                }
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = os.environ | {
+            "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}",
+            "LOG_LEVEL": "WARNING",
+            "LOG_REQUEST_SAMPLE_RATE": "0",
+            "AUTH_IP_BUCKET_CAPACITY": "1000000",
+        }
+        os.environ["DATABASE_URL"] = env["DATABASE_URL"]
+        asyncio.run(seed(env["DATABASE_URL"], 1, args.tasks))
+
+        print(f"{'workers':>8} {'scenario':>18} {'req/s':>10} {'p95 ms':>10} {'errors':>7}")
+        for workers in args.workers:
+            for scenario, result in measure(workers, args, env).items():
+                print(f"{workers:>8} {scenario:>18} {result['requests_per_second']:>10} {result['p95_ms']:>10} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=4, help="load generator processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="in-flight requests per client")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=4000, help="requests per scenario across all clients")
+    parser.add_argument("--scenarios", nargs="+", default=["get_by_id", "list_first_page", "write_mix"])
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,237 @@
+"""Load/benchmark suite for the API.
+
+Seeds a temporary SQLite file with users and tasks, serves app.main:app either in-process
+(httpx ASGI transport) or through a real uvicorn server, runs each scenario with the given
+concurrency and writes requests/sec and p50/p95/p99 latency per scenario to a JSON file.
+With --baseline, results are compared against a stored run and the exit code is 1 when any
+scenario regressed by more than --tolerance.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.load --tasks 100000 --concurrency 32 --output bench.json
+    python -m tests.benchmarks.load --uvicorn --baseline bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import insert
+
+BENCH_PASSWORD = "benchpassword"
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def seed(database_url: str, users: int, tasks: int):
+    from app.database import create_engines
+    from app.models import Base
+    from app.models.task import Task, TaskStatus
+    from app.models.user import User
+    from app.utils import hash_password
+
+    engine, _ = create_engines(database_url, "default")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # One bcrypt hash shared by every seeded user keeps seeding fast
+        hashed = hash_password(BENCH_PASSWORD)
+        await conn.execute(insert(User), [{"username": f"user{i}", "hashed_password": hashed} for i in range(users)])
+        for start in range(0, tasks, 10000):
+            await conn.execute(insert(Task), [
+                {"title": f"Task {i}", "description": "benchmark", "status": TaskStatus.open}
+                for i in range(start, min(start + 10000, tasks))
+            ])
+    await engine.dispose()
+
+
+def scenarios(tasks: int, limit: int = 100):
+    deep = max(tasks - limit, 0)
+
+    def list_first_page(i):
+        return "GET", "/tasks", {"params": {"limit": limit}}
+
+    def list_offset_deep(i):
+        return "GET", "/tasks", {"params": {"skip": random.randint(deep // 2, deep), "limit": limit}}
+
+    def list_cursor_deep(i):
+        from app.pagination import encode_cursor
+        return "GET", "/tasks", {"params": {"after": encode_cursor({"id": random.randint(deep // 2, deep)}), "limit": limit}}
+
+    def get_by_id(i):
+        return "GET", f"/tasks/{random.randint(1, tasks)}", {}
+
+    def write_mix(i):
+        choice = i % 3
+        if choice == 0:
+            return "POST", "/tasks", {"json": {"title": f"Load task {i}", "status": "open"}}
+        if choice == 1:
+            return "PATCH", f"/tasks/{random.randint(1, tasks)}", {"json": {"status": "in-progress"}}
+        return "DELETE", f"/tasks/{random.randint(1, tasks)}", {}
+
+    return {
+        "list_first_page": list_first_page,
+        "list_offset_deep": list_offset_deep,
+        "list_cursor_deep": list_cursor_deep,
+        "get_by_id": get_by_id,
+        "write_mix": write_mix,
+    }
+
+
+async def run_scenario(client, make_request, requests: int, concurrency: int, headers: dict | None, ok_statuses=(200, 201, 404)):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        method, url, kwargs = make_request(i)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, url, headers=headers, **kwargs)
+            latencies.append(time.perf_counter() - started)
+        if response.status_code not in ok_statuses:
+            errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+async def run_all(client, args) -> dict:
+    response = await client.post("/auth/login", data={"username": "user0", "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    results = {}
+    selected = args.scenarios or [*scenarios(args.tasks), "login_burst"]
+    for name, make_request in scenarios(args.tasks).items():
+        if name in selected:
+            results[name] = await run_scenario(client, make_request, args.requests, args.concurrency, headers)
+            print(f"{name:>18} {json.dumps(results[name])}")
+    if "login_burst" in selected:
+        def login(i):
+            return "POST", "/auth/login", {"data": {"username": f"user{i % args.users}", "password": BENCH_PASSWORD}}
+        results["login_burst"] = await run_scenario(client, login, args.login_requests, args.concurrency, None, ok_statuses=(200,))
+        print(f"{'login_burst':>18} {json.dumps(results['login_burst'])}")
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_server(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get("/metrics")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+async def main(args) -> dict:
+    await seed(os.environ["DATABASE_URL"], args.users, args.tasks)
+
+    if args.uvicorn:
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            env=os.environ.copy()
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            await wait_for_server(base_url)
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+                return await run_all(client, args)
+        finally:
+            server.terminate()
+            server.wait()
+
+    import logging
+    from app.main import app, lifespan
+    logging.disable(logging.INFO)
+    async with lifespan(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60) as client:
+            return await run_all(client, args)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        if current["requests_per_second"] < previous["requests_per_second"] * (1 - tolerance):
+            regressions.append(f"{name}: {previous['requests_per_second']} -> {current['requests_per_second']} req/s")
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenarios", nargs="*", help="subset of scenarios to run")
+    parser.add_argument("--uvicorn", action="store_true", help="run against a real uvicorn server instead of in-process")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="JSON file from a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.setdefault("LOG_REQUEST_SAMPLE_RATE", "0")
+        # Every request comes from one client, and login_burst measures hashing capacity, not the throttle
+        os.environ.setdefault("AUTH_IP_BUCKET_CAPACITY", "1000000")
+        os.environ.setdefault("PASSWORD_HASH_MAX_IN_FLIGHT", "1000000")
+        results = asyncio.run(main(args))
+
+    report = {
+        "meta": {
+            "mode": "uvicorn" if args.uvicorn else "asgi",
+            "users": args.users,
+            "tasks": args.tasks,
+            "concurrency": args.concurrency,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
@@ -1,6 +1,10 @@
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from unittest.mock import AsyncMock
+from app.core.cache import principal_cache
+from app.models import Base
 
 # Helper Functions
 def create_mock_result_for_scalar_one_or_none(value):
@@ -18,6 +22,25 @@ def create_mock_result_for_scalars(all_return_value):
     return mock_result
 
 
+def create_mock_result_for_all(all_return_value):
+    mock_result = AsyncMock()
+    mock_result.all = lambda: all_return_value
+    return mock_result
+
+
+def create_mock_result_for_scalars_all(all_return_value):
+    mock_result = AsyncMock()
+    mock_result.scalars = lambda: create_mock_result_for_all(all_return_value)
+    return mock_result
+
+
+async def query_plan(db, statement, parameters) -> list[str]:
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    cursor = await raw.driver_connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[3] for row in await cursor.fetchall()]
+
+
 # Fixture for the Mocked DB Session
 @pytest.fixture
 def mock_db():
@@ -27,4 +50,44 @@ def mock_db():
     db.refresh = AsyncMock()
     db.delete = AsyncMock()
     db.execute = AsyncMock()
-    return db
\ No newline at end of file
+    return db
+
+
+# A real SQLite file with the current schema; modules that need data override engine and seed it
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+
+
+@pytest_asyncio.fixture
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
+
+
+# Every statement sent to the engine, as (statement, parameters)
+@pytest.fixture
+def statements(engine):
+    executed = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture_statement(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    return executed
+
+
+@pytest.fixture(autouse=True)
+def clear_principal_cache():
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
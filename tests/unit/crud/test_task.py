@@ -1,10 +1,12 @@
 import pytest
 from pydantic import ValidationError
+from datetime import datetime, timedelta, timezone
 from app.crud import task
 from app.models.task import Task, TaskStatus
-from app.schemas import TaskCreate, TaskUpdate
+from app.schemas import TaskCreate, TaskUpdate, TaskPatch
 from tests.unit.conftest import create_mock_result_for_scalar_one_or_none
 from tests.unit.conftest import create_mock_result_for_scalars
+from tests.unit.conftest import create_mock_result_for_all, create_mock_result_for_scalars_all
 from fastapi import HTTPException
 
 
@@ -78,6 +80,49 @@ class TestTaskCRUD:
         mock_db.execute.assert_called_once()
 
 
+    async def test_get_tasks_after_cursor(self, mock_db):
+        mock_db.execute.return_value = create_mock_result_for_scalars([])
+
+        await task.get_tasks(mock_db, after_id=42, limit=10)
+
+        query = str(mock_db.execute.call_args.args[0])
+        assert "tasks.id >" in query
+        assert "OFFSET" not in query
+        assert "ORDER BY tasks.id" in query
+
+
+    async def test_get_tasks_filtered_and_sorted(self, mock_db):
+        mock_db.execute.return_value = create_mock_result_for_scalars([])
+
+        await task.get_tasks(mock_db, status=TaskStatus.open, created_after=datetime(2024, 1, 1), sort="created_at", order="desc",
+                             after_id=7, after_value=datetime(2024, 2, 1))
+
+        query = str(mock_db.execute.call_args.args[0])
+        assert "tasks.status =" in query
+        assert "tasks.created_at >" in query
+        assert "(tasks.created_at, tasks.id) <" in query
+        assert "ORDER BY tasks.created_at DESC, tasks.id DESC" in query
+
+
+    async def test_get_tasks_converts_aware_filters_to_utc(self, mock_db):
+        mock_db.execute.return_value = create_mock_result_for_scalars([])
+
+        await task.get_tasks(mock_db, created_after=datetime(2024, 1, 1, 12, tzinfo=timezone(timedelta(hours=2))))
+
+        params = mock_db.execute.call_args.args[0].compile().params
+        assert datetime(2024, 1, 1, 10) in params.values()
+
+
+    async def test_get_tasks_as_rows(self, mock_db):
+        mock_db.execute.return_value = create_mock_result_for_all([(1, "Task 1", None, TaskStatus.open, None, None)])
+
+        rows = await task.get_tasks(mock_db, as_rows=True)
+
+        assert rows[0][1] == "Task 1"
+        query = str(mock_db.execute.call_args.args[0])
+        assert query.startswith("SELECT tasks.id, tasks.title, tasks.description, tasks.status, tasks.created_at, tasks.updated_at")
+
+
     async def test_get_task(self, mock_db):
         mock_db.execute.return_value = create_mock_result_for_scalar_one_or_none(
             Task(id=1, title="Task 1", status=TaskStatus.open)
@@ -100,8 +145,8 @@ class TestTaskCRUD:
 
 
     async def test_update_task(self, mock_db):
-        existing_task = Task(id=1, title="Old Title", description="Old Description", status=TaskStatus.open)
-        mock_db.execute.return_value = create_mock_result_for_scalar_one_or_none(existing_task)
+        returned_task = Task(id=1, title="Updated Task", description="Updated Description", status=TaskStatus.in_progress)
+        mock_db.execute.return_value = create_mock_result_for_scalar_one_or_none(returned_task)
 
         update_data = TaskUpdate(
             title="Updated Task",
@@ -113,8 +158,28 @@ class TestTaskCRUD:
         assert updated_task.title == update_data.title
         assert updated_task.description == update_data.description
         assert updated_task.status == update_data.status
+        query = str(mock_db.execute.call_args.args[0])
+        assert query.startswith("UPDATE tasks") and "RETURNING" in query
+        mock_db.execute.assert_called_once()
         mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once()
+        mock_db.refresh.assert_not_called()
+
+
+    async def test_patch_task_writes_only_given_columns(self, mock_db):
+        returned_task = Task(id=1, title="Old Title", description="Old Description", status=TaskStatus.closed)
+        mock_db.execute.return_value = create_mock_result_for_scalar_one_or_none(returned_task)
+
+        patched_task = await task.update_task(mock_db, 1, TaskPatch(status=TaskStatus.closed))
+
+        assert patched_task.status == TaskStatus.closed
+        query = mock_db.execute.call_args.args[0]
+        assert [column.name for column in query._values] == ["status"]
+        mock_db.commit.assert_called_once()
+
+
+    async def test_patch_task_rejects_null_title(self):
+        with pytest.raises(ValidationError):
+            TaskPatch(title=None)
 
 
     async def test_update_task_not_found(self, mock_db):
@@ -132,12 +197,15 @@ class TestTaskCRUD:
 
 
     async def test_delete_task(self, mock_db):
-        existing_task = Task(id=1, title="Task to Delete", description="Description", status=TaskStatus.open)
+        existing_task = Task(id=1, title="Task to Delete", description="Description", status=TaskStatus.open, revision=3)
         mock_db.execute.return_value = create_mock_result_for_scalar_one_or_none(existing_task)
 
         deleted_task = await task.delete_task(mock_db, 1)
         assert deleted_task.id == 1
-        mock_db.delete.assert_called_once_with(existing_task)
+        delete_query, tombstone_query = (str(call.args[0]) for call in mock_db.execute.call_args_list)
+        assert delete_query.startswith("DELETE FROM tasks") and "RETURNING" in delete_query
+        assert tombstone_query.startswith("INSERT INTO task_tombstones")
+        mock_db.delete.assert_not_called()
         mock_db.commit.assert_called_once()
 
 
@@ -148,4 +216,54 @@ class TestTaskCRUD:
 
         assert deleted_task is None
         mock_db.delete.assert_not_called()
-        mock_db.commit.assert_not_called()
\ No newline at end of file
+        mock_db.commit.assert_not_called()
+
+    async def test_create_tasks(self, mock_db):
+        created = [Task(id=1, title="Task 1", status=TaskStatus.open), Task(id=2, title="Task 2", status=TaskStatus.open)]
+        mock_db.scalars.return_value = create_mock_result_for_all(created)
+        new_tasks = [TaskCreate(title=t.title, status=t.status) for t in created]
+
+        db_tasks = await task.create_tasks(mock_db, new_tasks)
+
+        assert [t.id for t in db_tasks] == [1, 2]
+        mock_db.scalars.assert_called_once()
+        assert len(mock_db.scalars.call_args.args[1]) == 2
+        mock_db.commit.assert_called_once()
+
+
+    async def test_create_tasks_db_error(self, mock_db):
+        mock_db.scalars.side_effect = Exception("Database failure")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await task.create_tasks(mock_db, [TaskCreate(title="Task 1", status=TaskStatus.open)])
+
+        assert exc_info.value.status_code == 500
+        mock_db.rollback.assert_called_once()
+
+
+    async def test_delete_tasks_keeps_input_order(self, mock_db):
+        mock_db.execute.return_value = create_mock_result_for_scalars_all(
+            [Task(id=3, title="Task 3", status=TaskStatus.open), Task(id=1, title="Task 1", status=TaskStatus.open)]
+        )
+
+        deleted = await task.delete_tasks(mock_db, [1, 2, 3])
+
+        assert [t.id if t else None for t in deleted] == [1, None, 3]
+        mock_db.commit.assert_called_once()
+
+
+    async def test_update_task_if_match_failed(self, mock_db):
+        existing_task = Task(id=1, title="Old Title", description=None, status=TaskStatus.open, revision=5)
+        mock_db.execute.side_effect = [
+            create_mock_result_for_scalar_one_or_none(None),
+            create_mock_result_for_scalar_one_or_none(existing_task),
+        ]
+
+        with pytest.raises(HTTPException) as exc_info:
+            await task.update_task(mock_db, 1, TaskPatch(title="New Title"), if_match='"stale"')
+
+        assert exc_info.value.status_code == 412
+        update_query = str(mock_db.execute.call_args_list[0].args[0])
+        assert update_query.startswith("UPDATE tasks") and "revision IN" in update_query
+        mock_db.commit.assert_not_called()
+        mock_db.rollback.assert_called_once()
@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import insert, text
+from app.crud import task
+from app.database import create_schema
+from app.models import Base
+from app.models.task import Task, TaskStatus
+from app.schemas import TaskCreate, TaskPatch, TaskBulkUpdate
+
+
+def new_task(title):
+    return TaskCreate(title=title, status=TaskStatus.open)
+
+
+@pytest.mark.asyncio
+class TestTaskChanges:
+
+    async def test_every_write_takes_a_higher_revision(self, db):
+        first = await task.create_task(db, new_task("Task 1"))
+        second = await task.create_task(db, new_task("Task 2"))
+        assert 0 < first.revision < second.revision
+
+        patched = await task.update_task(db, first.id, TaskPatch(status=TaskStatus.closed))
+        assert patched.revision > second.revision
+
+        updated = await task.update_tasks(db, [TaskBulkUpdate(id=second.id, title="Task 2 bulk", status=TaskStatus.open)])
+        assert updated[0].revision > patched.revision
+
+    async def test_feed_returns_only_changes_since_a_revision(self, db):
+        first = await task.create_task(db, new_task("Task 1"))
+        second = await task.create_task(db, new_task("Task 2"))
+        revision, rows, deleted = await task.get_task_changes(db, 0)
+        assert [row.id for row in rows] == [first.id, second.id]
+        assert deleted == []
+
+        await task.update_task(db, first.id, TaskPatch(title="Task 1 renamed"))
+        await task.delete_task(db, second.id)
+        latest, rows, deleted = await task.get_task_changes(db, revision)
+
+        assert [(row.id, row.title) for row in rows] == [(first.id, "Task 1 renamed")]
+        assert deleted == [second.id]
+        assert await task.get_task_changes(db, latest) == (latest, [], [])
+
+    async def test_tombstone_outranks_the_deleted_task(self, db):
+        await task.create_task(db, new_task("Task 1"))
+        newest = await task.create_task(db, new_task("Task 2"))
+
+        await task.delete_task(db, newest.id)
+        revision, rows, deleted = await task.get_task_changes(db, newest.revision)
+
+        assert revision > newest.revision
+        assert (rows, deleted) == ([], [newest.id])
+
+    async def test_pages_never_split_a_revision(self, db):
+        created = await task.create_tasks(db, [new_task(f"Task {i}") for i in range(5)])
+        ids = [db_task.id for db_task in created]
+        await task.delete_tasks(db, ids[:3])
+
+        since, seen_rows, seen_deleted = 0, [], []
+        while True:
+            revision, rows, deleted = await task.get_task_changes(db, since, limit=2)
+            if revision == since:
+                break
+            seen_rows += [row.id for row in rows]
+            seen_deleted += deleted
+            since = revision
+
+        assert seen_rows == ids[3:]
+        assert sorted(seen_deleted) == ids[:3]
+
+    async def test_revision_ahead_of_the_feed_is_reported_as_is(self, db):
+        await task.create_task(db, new_task("Task 1"))
+
+        revision, rows, deleted = await task.get_task_changes(db, 100)
+
+        assert revision < 100
+        assert (rows, deleted) == ([], [])
+
+
+@pytest.mark.asyncio
+async def test_existing_tasks_get_revisions_on_upgrade(engine, db):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.execute(text("CREATE TABLE tasks (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, description VARCHAR, "
+                                "status VARCHAR(11), created_at DATETIME, updated_at DATETIME)"))
+        await conn.execute(text("INSERT INTO tasks (title, status) VALUES ('Old 1', 'open'), ('Old 2', 'open')"))
+        await conn.run_sync(create_schema)
+        await conn.execute(insert(Task), [{"title": "New", "status": TaskStatus.open}])
+
+    revision, rows, _ = await task.get_task_changes(db, 0)
+
+    assert [(row.title, row.revision) for row in rows] == [("Old 1", 1), ("Old 2", 2), ("New", 3)]
+    assert revision == 3
@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from fastapi import HTTPException
+from app.core.etag import task_etag
+from app.crud import task
+from app.models.task import TaskStatus
+from app.schemas import TaskCreate, TaskUpdate, TaskPatch
+
+
+@pytest.mark.asyncio
+class TestTaskMutationQueryCount:
+
+    async def test_update_is_one_statement(self, db, statements):
+        created = await task.create_task(db, TaskCreate(title="Task 1", status=TaskStatus.open))
+        statements.clear()
+
+        updated = await task.update_task(db, created.id, TaskUpdate(title="Task 1 updated", status=TaskStatus.closed))
+
+        assert updated.title == "Task 1 updated"
+        assert updated.status == TaskStatus.closed
+        assert len(statements) == 1
+
+
+    async def test_patch_is_one_statement(self, db, statements):
+        created = await task.create_task(db, TaskCreate(title="Task 1", description="Keep me", status=TaskStatus.open))
+        statements.clear()
+
+        patched = await task.update_task(db, created.id, TaskPatch(status=TaskStatus.in_progress))
+
+        assert patched.status == TaskStatus.in_progress
+        assert patched.description == "Keep me"
+        assert len(statements) == 1
+        assert "description" not in statements[0][0].split("RETURNING")[0]
+
+
+    async def test_delete_is_delete_and_tombstone(self, db, statements):
+        created = await task.create_task(db, TaskCreate(title="Task 1", status=TaskStatus.open))
+        statements.clear()
+
+        deleted = await task.delete_task(db, created.id)
+
+        assert deleted.id == created.id
+        assert len(statements) == 2
+        assert statements[0][0].startswith("DELETE FROM tasks")
+        assert statements[1][0].startswith("INSERT INTO task_tombstones")
+        assert await task.get_task(db, created.id) is None
+
+
+    async def test_if_match_is_checked_by_the_write_itself(self, db, statements):
+        created = await task.create_task(db, TaskCreate(title="Task 1", status=TaskStatus.open))
+        etag = task_etag(created)
+        statements.clear()
+
+        updated = await task.update_task(db, created.id, TaskPatch(title="Task 1 renamed"), if_match=etag)
+
+        assert updated.title == "Task 1 renamed"
+        assert len(statements) == 1
+        assert "revision IN" in statements[0][0]
+
+        with pytest.raises(HTTPException) as exc_info:
+            await task.delete_task(db, updated.id, if_match=etag)
+        assert exc_info.value.status_code == 412
+        assert statements[-1][0].startswith("SELECT")
+
+
+    async def test_missing_task_is_one_statement(self, db, statements):
+        assert await task.update_task(db, 999, TaskPatch(title="Missing")) is None
+        assert await task.delete_task(db, 999) is None
+        assert len(statements) == 2
+
+
+    async def test_concurrent_identical_reads_share_one_query(self, engine, db, statements):
+        created = await task.create_task(db, TaskCreate(title="Task 1", status=TaskStatus.open))
+        sessions = [async_sessionmaker(bind=engine, class_=AsyncSession)() for _ in range(5)]
+        statements.clear()
+
+        fetched = await asyncio.gather(*(task.get_task(session, created.id) for session in sessions))
+        pages = await asyncio.gather(*(task.get_tasks(session, limit=10) for session in sessions))
+
+        assert [db_task.id for db_task in fetched] == [created.id] * 5
+        assert all(page is pages[0] for page in pages)
+        assert len(statements) == 2
+
+        await task.update_task(db, created.id, TaskPatch(title="Task 1 renamed"))
+        statements.clear()
+        async with async_sessionmaker(bind=engine, class_=AsyncSession)() as session:
+            renamed = await task.get_task(session, created.id)
+        assert renamed.title == "Task 1 renamed"
+        assert len(statements) == 1
+        for session in sessions:
+            await session.close()
+
+
+    async def test_concurrent_reads_of_different_ids_share_one_query(self, engine, db, statements):
+        created = await task.create_tasks(db, [TaskCreate(title=f"Task {i}", status=TaskStatus.open) for i in range(3)])
+        sessions = [async_sessionmaker(bind=engine, class_=AsyncSession)() for _ in range(4)]
+        statements.clear()
+
+        fetched = await asyncio.gather(*(task.get_task(session, task_id) for session, task_id in zip(sessions, [3, 1, 999, 2])))
+
+        assert [db_task and db_task.id for db_task in fetched] == [3, 1, None, 2]
+        assert len(statements) == 1
+        assert " IN " in statements[0][0]
+        for session in sessions:
+            await session.close()
+
+
+    async def test_lookup_keeps_request_order_and_chunks(self, db, statements):
+        await task.create_tasks(db, [TaskCreate(title=f"Task {i}", status=TaskStatus.open) for i in range(3)])
+        statements.clear()
+
+        found = await task.lookup_tasks(db, [2, 999, 1, 2])
+        assert [db_task and db_task.id for db_task in found] == [2, None, 1, 2]
+        # One chunk of live tasks, then one archive query for the missing ids
+        assert len(statements) == 2
+
+        statements.clear()
+        found = await task.lookup_tasks(db, list(range(1, task.BULK_CHUNK_SIZE + 2)))
+        assert [db_task.id for db_task in found[:3]] == [1, 2, 3]
+        assert found[3:] == [None] * (task.BULK_CHUNK_SIZE - 2)
+        assert len(statements) == 3
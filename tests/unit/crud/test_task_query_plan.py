@@ -0,0 +1,102 @@
+import itertools
+from datetime import datetime
+import pytest
+import pytest_asyncio
+from sqlalchemy import text, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.crud import task
+from app.database import create_missing_indexes, add_missing_columns
+from app.models import Base
+from app.models.task import Task, TaskStatus
+from tests.unit.conftest import query_plan
+
+
+FILTERS = {
+    "status": TaskStatus.open,
+    "created_after": datetime(2024, 1, 5),
+    "created_before": datetime(2024, 1, 20),
+    "updated_after": datetime(2024, 1, 10),
+}
+SORTS = list(itertools.product(["id", "created_at", "updated_at", "title"], ["asc", "desc"]))
+INDEXED = ("USING INDEX", "USING COVERING INDEX", "USING INTEGER PRIMARY KEY")
+
+
+# Seeded and analyzed so the planner sees realistic statistics
+@pytest_asyncio.fixture
+async def engine(engine):
+    async with engine.begin() as conn:
+        await conn.execute(insert(Task), [
+            {
+                "title": f"Task {i % 97}",
+                "status": list(TaskStatus)[i % 3],
+                "created_at": datetime(2024, 1, 1 + i % 28, i % 24),
+                "updated_at": datetime(2024, 1, 1 + i % 28, i % 24),
+            }
+            for i in range(2000)
+        ])
+        await conn.execute(text("ANALYZE"))
+    return engine
+
+
+@pytest.mark.asyncio
+class TestTaskListQueryPlan:
+
+    @pytest.mark.parametrize("sort,order", SORTS)
+    async def test_every_filter_combination_uses_an_index(self, db, statements, sort, order):
+        for size in range(len(FILTERS) + 1):
+            for names in itertools.combinations(FILTERS, size):
+                filters = {name: FILTERS[name] for name in names}
+                for after in (None, (500, "Task 50" if sort == "title" else datetime(2024, 1, 15))):
+                    statements.clear()
+                    after_id, after_value = after or (None, None)
+                    await task.get_tasks(db, limit=50, after_id=after_id, after_value=after_value, sort=sort, order=order, **filters)
+
+                    plan = await query_plan(db, *statements[0])
+                    if sort == "id" and not names and after is None:
+                        # The unfiltered first page walks the primary key b-tree in order and stops at the limit
+                        assert plan == ["SCAN tasks"], plan
+                        continue
+                    assert any(marker in line for line in plan for marker in INDEXED), (names, after, plan)
+
+    @pytest.mark.parametrize("sort", ["created_at", "updated_at", "title"])
+    async def test_status_filter_with_sort_needs_no_temp_sort(self, db, statements, sort):
+        await task.get_tasks(db, limit=50, sort=sort, status=TaskStatus.closed)
+
+        plan = await query_plan(db, *statements[0])
+        assert not any("TEMP B-TREE" in line for line in plan), plan
+
+
+@pytest.mark.asyncio
+class TestTaskListKeyset:
+
+    @pytest.mark.parametrize("sort,order", SORTS)
+    async def test_cursor_pages_match_a_single_query(self, db, sort, order):
+        filters = {"status": TaskStatus.in_progress, "created_after": datetime(2024, 1, 3)}
+        expected = [db_task.id for db_task in await task.get_tasks(db, limit=5000, sort=sort, order=order, **filters)]
+
+        seen, after_id, after_value = [], None, None
+        while True:
+            page = await task.get_tasks(db, limit=37, after_id=after_id, after_value=after_value, sort=sort, order=order, **filters)
+            if not page:
+                break
+            seen.extend(db_task.id for db_task in page)
+            after_id, after_value = page[-1].id, getattr(page[-1], sort)
+
+        assert seen == expected
+        assert len(expected) > 37
+
+
+@pytest.mark.asyncio
+async def test_missing_indexes_are_created_on_existing_tables(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE tasks (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, description VARCHAR, "
+                                "status VARCHAR(11), created_at DATETIME, updated_at DATETIME)"))
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
+        await conn.run_sync(create_missing_indexes)
+        result = await conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tasks'"))
+        names = {row[0] for row in result}
+    await engine.dispose()
+
+    assert {index.name for index in Task.__table__.indexes} <= names
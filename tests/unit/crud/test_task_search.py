@@ -0,0 +1,87 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import text, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.crud import task
+from app.models import Base
+from app.models.task import Task, TaskStatus
+from app.schemas import TaskCreate, TaskUpdate
+from app.search import create_search_index
+from tests.unit.conftest import query_plan
+
+
+@pytest_asyncio.fixture
+async def engine(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(create_search_index)
+    return engine
+
+
+def ids(hits):
+    return [hit.Task.id for hit in hits]
+
+
+@pytest.mark.asyncio
+class TestTaskSearch:
+
+    async def test_triggers_keep_index_in_sync(self, db):
+        first = await task.create_task(db, TaskCreate(title="Quarterly report", status=TaskStatus.open))
+        second = await task.create_task(db, TaskCreate(title="Fix printer", description="Paper jam", status=TaskStatus.open))
+
+        assert ids(await task.search_tasks(db, '"report"')) == [first.id]
+
+        await task.update_task(db, first.id, TaskUpdate(title="Quarterly summary", status=TaskStatus.open))
+        assert await task.search_tasks(db, '"report"') == []
+        assert ids(await task.search_tasks(db, '"summary"')) == [first.id]
+
+        await task.delete_task(db, second.id)
+        assert await task.search_tasks(db, '"jam"') == []
+
+    async def test_prefix_match_and_highlight(self, db):
+        created = await task.create_task(db, TaskCreate(title="Reporting pipeline", description="Nightly reports", status=TaskStatus.open))
+
+        hits = await task.search_tasks(db, '"report"*')
+
+        assert ids(hits) == [created.id]
+        assert hits[0].title_highlight == "<mark>Reporting</mark> pipeline"
+        assert "<mark>reports</mark>" in hits[0].snippet
+
+    async def test_title_matches_rank_first(self, db):
+        in_description = await task.create_task(db, TaskCreate(title="Weekly sync", description="Discuss the budget", status=TaskStatus.open))
+        in_title = await task.create_task(db, TaskCreate(title="Budget review", status=TaskStatus.open))
+
+        assert ids(await task.search_tasks(db, '"budget"')) == [in_title.id, in_description.id]
+
+    async def test_cursor_pages_cover_every_hit_once(self, db):
+        await task.create_tasks(db, [TaskCreate(title=f"Deploy service {i}", status=TaskStatus.open) for i in range(23)])
+        expected = ids(await task.search_tasks(db, '"deploy"', limit=100))
+
+        seen, after_id, after_score = [], None, None
+        while True:
+            page = await task.search_tasks(db, '"deploy"', limit=5, after_id=after_id, after_score=after_score)
+            if not page:
+                break
+            seen.extend(ids(page))
+            after_id, after_score = page[-1].Task.id, page[-1].score
+
+        assert seen == expected
+        assert len(seen) == 23
+
+    async def test_search_uses_the_fts_index(self, db, statements):
+        await task.search_tasks(db, '"report"', after_id=1, after_score=-1.0)
+
+        plan = await query_plan(db, *statements[0])
+        assert any("VIRTUAL TABLE INDEX" in line for line in plan), plan
+        assert not any(line.startswith("SCAN tasks ") or line == "SCAN tasks" for line in plan), plan
+
+
+@pytest.mark.asyncio
+async def test_existing_rows_are_indexed_when_search_is_added(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Task), [{"title": "Legacy migration", "status": TaskStatus.open}])
+        await conn.run_sync(create_search_index)
+        result = await conn.execute(text("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'legacy'"))
+        assert result.scalars().all() == [1]
+    await engine.dispose()
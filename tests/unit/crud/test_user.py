@@ -3,6 +3,7 @@ from app.crud.user import get_user_by_username, create_user
 from app.models.user import User
 from tests.unit.conftest import create_mock_result_for_scalar_one_or_none
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 
 
 @pytest.mark.asyncio
@@ -72,3 +73,28 @@ class TestUserCRUD:
         mock_db.refresh.assert_called_once()
 
 
+
+
+    async def test_create_user_duplicate_skips_hashing(self, mock_db, monkeypatch):
+        mock_db.execute.return_value = create_mock_result_for_scalar_one_or_none(User(id=1, username="taken", hashed_password="x"))
+        hash_calls = []
+        monkeypatch.setattr("app.crud.user.hash_password", lambda pwd: hash_calls.append(pwd))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await create_user(mock_db, "taken", "secret")
+
+        assert exc_info.value.status_code == 400
+        assert hash_calls == []
+        mock_db.add.assert_not_called()
+
+
+    async def test_create_user_concurrent_duplicate(self, mock_db, monkeypatch):
+        mock_db.execute.return_value = create_mock_result_for_scalar_one_or_none(None)
+        mock_db.commit.side_effect = IntegrityError("INSERT INTO users", {}, Exception("UNIQUE constraint failed"))
+        monkeypatch.setattr("app.crud.user.hash_password", lambda pwd: f"hashed_{pwd}")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await create_user(mock_db, "racer", "secret")
+
+        assert exc_info.value.status_code == 400
+        mock_db.rollback.assert_called()
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, delete
+from app import database
+from app.archive import TaskArchiver, incremental_vacuum
+from app.config import Settings
+from app.crud import task
+from app.models.task import Task, TaskStatus, ArchivedTask
+from app.schemas import TaskCreate
+
+
+OLD = datetime.utcnow().replace(microsecond=0) - timedelta(days=200)
+RECENT = datetime.utcnow().replace(microsecond=0) - timedelta(days=1)
+
+
+@pytest_asyncio.fixture
+async def configured(tmp_path):
+    database.configure_database(Settings(database_url=f"sqlite+aiosqlite:///{tmp_path / 'archive.db'}"))
+    await database.init_db()
+    yield
+    await database.dispose_engines()
+    database.configure_database(Settings())
+
+
+async def seed(rows):
+    async with database.engine.begin() as conn:
+        await conn.execute(insert(Task), [
+            {"title": title, "status": status, "created_at": updated_at, "updated_at": updated_at}
+            for title, status, updated_at in rows
+        ])
+
+
+def archiver(batch_size=2):
+    return TaskArchiver(database.AsyncSessionLocal, after_days=90, interval=60, batch_size=batch_size, batch_pause=0, vacuum_pages=1000)
+
+
+@pytest.mark.asyncio
+async def test_moves_only_old_closed_tasks(configured):
+    await seed([
+        ("Old closed 1", TaskStatus.closed, OLD),
+        ("Old open", TaskStatus.open, OLD),
+        ("Old closed 2", TaskStatus.closed, OLD),
+        ("Recent closed", TaskStatus.closed, RECENT),
+        ("Old closed 3", TaskStatus.closed, OLD),
+        ("Newest, old closed", TaskStatus.closed, OLD),
+    ])
+    job = archiver()
+
+    assert await job.run_once() == 4
+
+    async with database.AsyncSessionReadLocal() as db:
+        hot = (await db.execute(select(Task.title).order_by(Task.id))).scalars().all()
+        archived = (await db.execute(select(ArchivedTask.title).order_by(ArchivedTask.id))).scalars().all()
+        assert hot == ["Old open", "Recent closed"]
+        assert archived == ["Old closed 1", "Old closed 2", "Old closed 3", "Newest, old closed"]
+        assert await task.get_task(db, 1) is None
+        assert (await task.get_archived_task(db, 1)).title == "Old closed 1"
+        _, _, deleted = await task.get_task_changes(db, 0)
+        assert sorted(deleted) == [1, 3, 5, 6]
+    assert job.stats()["archived"] == 4
+    assert await job.run_once() == 0
+
+
+@pytest.mark.asyncio
+async def test_archived_ids_are_not_reused(configured):
+    await seed([
+        ("Old closed 1", TaskStatus.closed, OLD),
+        ("Old closed 2", TaskStatus.closed, OLD),
+        ("Old closed 3", TaskStatus.closed, OLD),
+    ])
+    assert await archiver(batch_size=2).run_once() == 3
+
+    async with database.AsyncSessionLocal() as db:
+        created = await task.create_tasks(db, [TaskCreate(title="New task", status=TaskStatus.closed)])
+        assert created[0].id == 4
+        assert (await task.get_archived_task(db, 1)).title == "Old closed 1"
+        assert [found.title for found in await task.lookup_tasks(db, [1, 4])] == ["Old closed 1", "New task"]
+
+    async with database.engine.begin() as conn:
+        await conn.execute(Task.__table__.update().values(updated_at=OLD))
+    assert await archiver().run_once() == 1
+    async with database.AsyncSessionReadLocal() as db:
+        archived = (await db.execute(select(ArchivedTask.id, ArchivedTask.title).order_by(ArchivedTask.id))).all()
+    assert archived == [(1, "Old closed 1"), (2, "Old closed 2"), (3, "Old closed 3"), (4, "New task")]
+
+
+@pytest.mark.asyncio
+async def test_incremental_vacuum_returns_free_pages(configured):
+    await seed([(f"Task {i} " + "x" * 2000, TaskStatus.open, RECENT) for i in range(500)])
+    async with database.engine.begin() as conn:
+        assert (await conn.exec_driver_sql("PRAGMA auto_vacuum")).scalar() == 2
+        await conn.execute(delete(Task))
+        free_pages = (await conn.exec_driver_sql("PRAGMA freelist_count")).scalar()
+
+    assert free_pages > 1
+    assert await incremental_vacuum(database.engine, free_pages) == free_pages
+
+
+@pytest.mark.asyncio
+async def test_stop_lets_the_background_job_finish(configured):
+    job = archiver()
+    job.start()
+    await asyncio.sleep(0.1)
+
+    await asyncio.wait_for(job.stop(), 5)
+
+    assert job.stats()["runs"] == 1
+    assert job.stats()["errors"] == 0
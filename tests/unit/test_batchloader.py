@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from app.core.batchloader import BatchLoader
+
+
+class SlowFetch:
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self, keys):
+        self.calls.append(keys)
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return {key: key * 10 for key in keys if key != 404}
+
+
+@pytest.mark.asyncio
+async def test_loads_in_one_tick_share_one_fetch():
+    loader = BatchLoader("test")
+    fetch = SlowFetch()
+    fetch.release.set()
+
+    results = await asyncio.gather(*(loader.load(key, fetch) for key in (3, 1, 404, 3)))
+
+    assert results == [30, 10, None, 30]
+    assert fetch.calls == [[3, 1, 404]]
+    assert loader.stats() == {"batches": 1, "keys": 3}
+
+
+@pytest.mark.asyncio
+async def test_loads_after_the_batch_started_get_a_new_batch():
+    loader = BatchLoader("test")
+    fetch = SlowFetch()
+    first = asyncio.create_task(loader.load(1, fetch))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    second = asyncio.create_task(loader.load(2, fetch))
+    fetch.release.set()
+
+    assert (await first, await second) == (10, 20)
+    assert fetch.calls == [[1], [2]]
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    loader = BatchLoader("test")
+    fetch = SlowFetch(error=ValueError("boom"))
+    fetch.release.set()
+
+    results = await asyncio.gather(loader.load(1, fetch), loader.load(2, fetch), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(fetch.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_batch_runner_hands_over_to_the_others():
+    loader = BatchLoader("test")
+    fetch = SlowFetch()
+    runner = asyncio.create_task(loader.load(1, fetch))
+    other = asyncio.create_task(loader.load(2, fetch))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    runner.cancel()
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await other == 20
+    assert runner.cancelled()
+    assert fetch.calls == [[1, 2], [2]]
+
+
+@pytest.mark.asyncio
+async def test_disabled_fetches_every_key_alone():
+    loader = BatchLoader("test", enabled=False)
+    fetch = SlowFetch()
+    fetch.release.set()
+
+    assert await asyncio.gather(loader.load(1, fetch), loader.load(2, fetch)) == [10, 20]
+    assert fetch.calls == [[1], [2]]
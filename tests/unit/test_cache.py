@@ -0,0 +1,72 @@
+from app.core import cache
+from app.core.cache import TTLCache
+
+
+def test_cache_hit_and_miss():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 1, "bytes": 0, "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+
+    now[0] += 10
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 1
+
+
+def test_cache_invalidate_where():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate_where(lambda value: value == 2)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+
+def test_cache_respects_memory_cap():
+    cache = TTLCache(maxsize=10, ttl=60, max_bytes=10, weigh=len)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+    cache.set("c", b"123")
+
+    assert cache.get("a") is None
+    assert cache.get("b") == b"12345"
+    assert cache.bytes == 8
+    cache.set("huge", b"x" * 11)
+    assert cache.get("huge") is None
+    assert cache.bytes == 8
+
+
+def test_bump_task_table_version_drops_cached_pages():
+    version = cache.task_table_version
+    cache.task_list_cache.set((version, 0, None, 10), (b"[]", {}))
+
+    cache.bump_task_table_version()
+
+    assert cache.task_table_version == version + 1
+    assert len(cache.task_list_cache) == 0
+    assert cache.task_list_cache.bytes == 0
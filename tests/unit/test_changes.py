@@ -0,0 +1,24 @@
+import asyncio
+import pytest
+from app.core.changes import ChangeNotifier
+
+
+@pytest.mark.asyncio
+async def test_notify_wakes_every_waiter():
+    notifier = ChangeNotifier()
+    waiters = [asyncio.create_task(notifier.wait(5)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert notifier.stats()["waiters"] == 3
+
+    notifier.notify()
+
+    assert await asyncio.gather(*waiters) == [True, True, True]
+    assert notifier.stats() == {"waiters": 0, "notifications": 1}
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out_without_a_write():
+    notifier = ChangeNotifier()
+
+    assert await notifier.wait(0.01) is False
+    assert notifier.stats()["waiters"] == 0
@@ -0,0 +1,106 @@
+import gzip
+import pytest
+from app.core import compression
+from app.core.compression import CompressionMiddleware, choose_encoding
+
+
+LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+BODY = b'{"title":"Task"}' * 200
+
+
+def make_app(body=BODY, headers=(), chunks=None):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json"), *headers]})
+        for chunk in chunks or [body]:
+            await send({"type": "http.response.body", "body": chunk, "more_body": chunks is not None})
+        if chunks is not None:
+            await send({"type": "http.response.body", "body": b""})
+    return app
+
+
+async def call(app, accept_encoding: str | None, minimum_size: int = 100):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    request_headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    middleware = CompressionMiddleware(app, minimum_size=minimum_size, levels=LEVELS, preference=("zstd", "br", "gzip"))
+    await middleware({"type": "http", "headers": request_headers}, None, send)
+    headers = dict(messages[0]["headers"])
+    return headers, b"".join(message.get("body", b"") for message in messages[1:])
+
+
+def test_choose_encoding_honours_quality_and_preference():
+    preference = ("zstd", "br", "gzip")
+
+    assert choose_encoding("gzip, br", preference) == "br"
+    assert choose_encoding("gzip;q=1.0, br;q=0.5", preference) == "gzip"
+    assert choose_encoding("br;q=0, gzip", preference) == "gzip"
+    assert choose_encoding("*", preference) == "zstd"
+    assert choose_encoding("identity", preference) is None
+
+
+@pytest.mark.asyncio
+async def test_gzip_response_above_threshold():
+    headers, body = await call(make_app(headers=[(b"etag", b'"abc"'), (b"vary", b"Accept")]), "gzip")
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert gzip.decompress(body) == BODY
+    assert headers[b"content-length"] == str(len(body)).encode()
+    assert headers[b"vary"] == b"Accept, Accept-Encoding"
+    assert headers[b"etag"] == b'"abc-gzip"'
+
+
+@pytest.mark.asyncio
+async def test_small_and_unaccepted_responses_pass_through():
+    headers, body = await call(make_app(body=b"[]"), "gzip")
+    assert b"content-encoding" not in headers and body == b"[]"
+
+    headers, body = await call(make_app(), None)
+    assert b"content-encoding" not in headers and body == BODY
+
+
+@pytest.mark.asyncio
+async def test_already_encoded_and_event_streams_are_left_alone():
+    headers, body = await call(make_app(headers=[(b"content-encoding", b"gzip")]), "gzip")
+    assert headers[b"content-encoding"] == b"gzip" and body == BODY
+
+    async def events(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/event-stream")]})
+        await send({"type": "http.response.body", "body": BODY})
+    headers, body = await call(events, "gzip")
+    assert b"content-encoding" not in headers and body == BODY
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_is_compressed_chunk_by_chunk():
+    chunks = [b'{"id":%d}\n' % i * 50 for i in range(5)]
+
+    headers, body = await call(make_app(chunks=chunks), "gzip")
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    assert gzip.decompress(body) == b"".join(chunks)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("coding, module", [("br", "brotli"), ("zstd", "zstandard")])
+async def test_optional_codecs(coding, module):
+    codec = pytest.importorskip(module)
+
+    headers, body = await call(make_app(), coding)
+
+    assert headers[b"content-encoding"] == coding.encode()
+    decompressed = codec.decompress(body) if coding == "br" else codec.ZstdDecompressor().decompress(body)
+    assert decompressed == BODY
+
+
+@pytest.mark.asyncio
+async def test_missing_codec_is_not_offered(monkeypatch):
+    monkeypatch.setattr(compression, "zstandard", None)
+    monkeypatch.setattr(compression, "brotli", None)
+
+    headers, _ = await call(make_app(), "zstd, br, gzip")
+
+    assert headers[b"content-encoding"] == b"gzip"
@@ -10,6 +10,8 @@ from app.core.auth import (
     ALGORITHM
 )
 from unittest.mock import AsyncMock
+from app.core.cache import principal_cache, invalidate_principal
+from app.models.user import User
 
 
 @pytest.mark.asyncio
@@ -91,3 +93,34 @@ async def test_get_current_user_invalid_token():
 
     assert excinfo.value.status_code == 401
     assert excinfo.value.detail == "Invalid authentication credentials"
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_cached(mocker):
+    fake_user = User(id=1, username="cacheduser", hashed_password="hashed")
+    lookup = mocker.patch("app.core.auth.get_user_by_username", new=AsyncMock(return_value=fake_user))
+
+    mock_db = AsyncMock()
+    token = create_access_token({"sub": "cacheduser"})
+    # Hit counters are cumulative for /metrics and survive clear(), so only the change is checked
+    hits = principal_cache.hits
+    first = await get_current_user(token, mock_db)
+    second = await get_current_user(token, mock_db)
+
+    assert first is second is fake_user
+    lookup.assert_called_once()
+    assert principal_cache.hits == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_cache_invalidated(mocker):
+    fake_user = User(id=1, username="cacheduser", hashed_password="hashed")
+    lookup = mocker.patch("app.core.auth.get_user_by_username", new=AsyncMock(return_value=fake_user))
+
+    mock_db = AsyncMock()
+    token = create_access_token({"sub": "cacheduser"})
+    await get_current_user(token, mock_db)
+    invalidate_principal("cacheduser")
+    await get_current_user(token, mock_db)
+
+    assert lookup.call_count == 2
@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy import text
+from app.database import create_engines
+
+
+@pytest.mark.asyncio
+async def test_create_engines_default_profile_shares_engine(tmp_path):
+    write_engine, read_engine = create_engines(f"sqlite+aiosqlite:///{tmp_path / 'default.db'}", "default")
+
+    assert write_engine is read_engine
+    await write_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_create_engines_tuned_profile_applies_pragmas(tmp_path):
+    pragmas = {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 1234}
+    write_engine, read_engine = create_engines(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}", "tuned", pragmas, read_pool_size=2)
+
+    async with write_engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 1234
+        assert (await conn.execute(text("PRAGMA query_only"))).scalar() == 0
+    async with read_engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1
+        assert (await conn.execute(text("PRAGMA query_only"))).scalar() == 1
+
+    assert write_engine.pool.size() == 1
+    await write_engine.dispose()
+    await read_engine.dispose()
@@ -0,0 +1,62 @@
+from datetime import datetime
+from app.core.etag import task_etag, collection_etag, etag_matches, if_match_revisions, coded_etag
+from app.models.task import Task, TaskStatus
+
+
+def make_task(**overrides):
+    values = {"id": 1, "title": "Task 1", "description": None, "status": TaskStatus.open, "updated_at": datetime(2024, 1, 1), "revision": 7}
+    return Task(**(values | overrides))
+
+
+def test_task_etag_changes_with_revision():
+    etag = task_etag(make_task())
+
+    assert etag == task_etag(make_task(title="Task 1 reloaded"))
+    assert etag != task_etag(make_task(revision=8))
+    assert etag != task_etag(make_task(id=2))
+    assert etag.startswith('"7-') and etag.endswith('"')
+
+
+def test_etags_differ_per_media_type():
+    tasks = [make_task(), make_task(id=2)]
+
+    assert task_etag(tasks[0], "application/json") != task_etag(tasks[0], "application/msgpack")
+    assert task_etag(tasks[0]) == task_etag(tasks[0], "application/json")
+    assert collection_etag(tasks, 0, None, 10, media_type="application/json") != collection_etag(tasks, 0, None, 10, media_type="application/cbor")
+
+
+def test_collection_etag_depends_on_rows_and_query():
+    tasks = [make_task(), make_task(id=2)]
+
+    assert collection_etag(tasks, 0, None, 10) == collection_etag(tasks, 0, None, 10)
+    assert collection_etag(tasks, 0, None, 10) != collection_etag(tasks, 0, None, 20)
+    assert collection_etag(tasks, 0, None, 10) != collection_etag(tasks[:1], 0, None, 10)
+
+
+def test_etag_matches():
+    etag = '"abc"'
+
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"x", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"x"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_if_match_names_revisions_of_the_task():
+    etag = task_etag(make_task())
+
+    assert if_match_revisions(f'"x", {etag}', 1) == {7}
+    assert if_match_revisions(f'{etag}, {task_etag(make_task(revision=9))}', 1) == {7, 9}
+    assert if_match_revisions(f"W/{etag}", 1) == set()
+    assert if_match_revisions(etag, 2) == set()
+    assert if_match_revisions("*", 1) is None
+
+
+def test_content_coded_etags_name_the_same_state():
+    etag = task_etag(make_task())
+
+    assert coded_etag(etag, "zstd") == etag[:-1] + '-zstd"'
+    assert etag_matches(coded_etag(etag, "br"), etag)
+    assert if_match_revisions(coded_etag(etag, "gzip"), 1) == {7}
+    assert if_match_revisions(f"W/{coded_etag(etag, 'gzip')}", 1) == set()
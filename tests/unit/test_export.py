@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+import zlib
+import pytest
+from datetime import datetime
+from app.export import ndjson_chunks, csv_chunks, gzip_chunks
+from app.models.task import TaskStatus
+
+
+async def fake_rows(count):
+    for i in range(1, count + 1):
+        yield {
+            "id": i,
+            "title": f"Task {i}",
+            "description": None,
+            "status": TaskStatus.open,
+            "created_at": datetime(2024, 1, 1),
+            "updated_at": datetime(2024, 1, 2),
+        }
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_chunks():
+    chunks = await collect(ndjson_chunks(fake_rows(5), chunk_rows=2))
+
+    assert len(chunks) == 3
+    lines = b"".join(chunks).decode().splitlines()
+    assert json.loads(lines[0]) == {
+        "id": 1, "title": "Task 1", "description": None, "status": "open",
+        "created_at": "2024-01-01T00:00:00", "updated_at": "2024-01-02T00:00:00"
+    }
+    assert len(lines) == 5
+
+
+@pytest.mark.asyncio
+async def test_csv_chunks():
+    chunks = await collect(csv_chunks(fake_rows(3), chunk_rows=2))
+
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == ["id", "title", "description", "status", "created_at", "updated_at"]
+    assert rows[1][:4] == ["1", "Task 1", "", "open"]
+    assert len(rows) == 4
+
+
+@pytest.mark.asyncio
+async def test_gzip_chunks():
+    chunks = await collect(gzip_chunks(ndjson_chunks(fake_rows(3), chunk_rows=1)))
+
+    assert len(chunks) == 4
+    assert len(zlib.decompress(b"".join(chunks), wbits=31).decode().splitlines()) == 3
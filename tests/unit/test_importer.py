@@ -0,0 +1,77 @@
+import pytest
+from unittest.mock import AsyncMock
+from app.importer import import_tasks, iter_lines
+
+
+async def byte_chunks(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson_in_batches(mocker, mock_db):
+    insert_rows = mocker.patch("app.importer.insert_task_rows", new=AsyncMock())
+    data = "\n".join(
+        ['{"title": "Task %d", "status": "open"}' % i for i in range(5)] + ["not json", '{"title": "ab", "status": "open"}']
+    ).encode()
+
+    summary = await import_tasks(mock_db, byte_chunks(data), "ndjson", batch_size=2, max_reported_errors=10)
+
+    assert summary.total_records == 7
+    assert summary.inserted == 5
+    assert summary.rejected == 2
+    assert [error.line for error in summary.errors] == [6, 7]
+    assert [len(call.args[1]) for call in insert_rows.call_args_list] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_import_csv_with_quoted_newlines(mocker, mock_db):
+    insert_rows = mocker.patch("app.importer.insert_task_rows", new=AsyncMock())
+    data = 'id,title,description,status\n1,"Task, one","first\nsecond ""line""",open\n2,Task two,,closed\n3,bad\n'.encode()
+
+    summary = await import_tasks(mock_db, byte_chunks(data), "csv", batch_size=100, max_reported_errors=10)
+
+    assert summary.inserted == 2
+    assert summary.rejected == 1
+    assert summary.errors[0].line == 5
+    rows = insert_rows.call_args.args[1]
+    assert rows[0]["title"] == "Task, one"
+    assert rows[0]["description"] == 'first\nsecond "line"'
+    assert rows[1]["description"] is None
+
+
+@pytest.mark.asyncio
+async def test_import_caps_reported_errors(mocker, mock_db):
+    mocker.patch("app.importer.insert_task_rows", new=AsyncMock())
+    data = b"bad\n" * 20
+
+    summary = await import_tasks(mock_db, byte_chunks(data), "ndjson", batch_size=10, max_reported_errors=3)
+
+    assert summary.rejected == 20
+    assert len(summary.errors) == 3
+
+
+@pytest.mark.asyncio
+async def test_import_rejects_overlong_lines(mocker, mock_db):
+    insert_rows = mocker.patch("app.importer.insert_task_rows", new=AsyncMock())
+    long_line = '{"title": "' + "x" * 500 + '", "status": "open"}'
+    data = "\n".join(['{"title": "Task 1", "status": "open"}', long_line, '{"title": "Task 3", "status": "open"}', long_line]).encode()
+
+    summary = await import_tasks(mock_db, byte_chunks(data), "ndjson", batch_size=10, max_reported_errors=10, max_line_length=100)
+
+    assert summary.inserted == 2
+    assert [(error.line, error.detail) for error in summary.errors] == [(2, "Line is longer than 100 characters"), (4, "Line is longer than 100 characters")]
+    assert [row["title"] for row in insert_rows.call_args.args[1]] == ["Task 1", "Task 3"]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_never_buffers_past_the_limit():
+    async def endless_line():
+        for _ in range(1000):
+            yield b"x" * 1000
+        yield b"\nnext\n"
+
+    lines = [line async for line in iter_lines(endless_line(), max_line_length=4096)]
+
+    assert isinstance(lines[0], ValueError)
+    assert lines[1:] == ["next"]
@@ -0,0 +1,47 @@
+import json
+import logging
+from app.core.logging_config import JsonFormatter, RequestIdFilter, RequestSampleFilter, request_id_var
+
+
+def make_record(level=logging.INFO, msg="Fetching task with ID=%s", args=(1,)):
+    return logging.LogRecord("app.requests", level, __file__, 10, msg, args, None)
+
+
+def test_request_id_filter_adds_request_id():
+    token = request_id_var.set("req-1")
+    record = make_record()
+    RequestIdFilter().filter(record)
+    request_id_var.reset(token)
+
+    assert record.request_id == "req-1"
+
+
+def test_json_formatter():
+    record = make_record()
+    record.request_id = "req-1"
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "Fetching task with ID=1"
+    assert entry["request_id"] == "req-1"
+    assert entry["level"] == "INFO"
+
+
+def test_sample_filter_keeps_whole_requests():
+    sample_filter = RequestSampleFilter(0.5)
+    kept = 0
+    for i in range(1000):
+        token = request_id_var.set(f"req-{i}")
+        decisions = {sample_filter.filter(make_record()) for _ in range(3)}
+        request_id_var.reset(token)
+        assert len(decisions) == 1
+        kept += decisions.pop()
+
+    assert 400 < kept < 600
+
+
+def test_sample_filter_always_keeps_warnings():
+    sample_filter = RequestSampleFilter(0)
+
+    assert not sample_filter.filter(make_record())
+    assert sample_filter.filter(make_record(level=logging.WARNING))
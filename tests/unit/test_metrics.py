@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from app.core.metrics import Counter, Histogram, Registry, statement_type
+from app.core.metrics import before_cursor_execute, after_cursor_execute, db_query_duration_seconds
+
+
+def test_counter_render():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests.", ("route",)))
+    requests.inc("/tasks")
+    requests.inc("/tasks", amount=2)
+
+    text = registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/tasks"} 3.0' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)))
+    latency.observe(0.05, "/tasks")
+    latency.observe(0.1, "/tasks")
+    latency.observe(5, "/tasks")
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{route="/tasks",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/tasks",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{route="/tasks",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/tasks"} 3' in lines
+
+
+def test_collector_gauges():
+    registry = Registry()
+    registry.add_collector(lambda: [("cache", "Cache counters.", {"hits": 4}, "stat")])
+
+    assert 'cache{stat="hits"} 4' in registry.render()
+
+
+def test_statement_type():
+    assert statement_type("SELECT tasks.id FROM tasks") == "SELECT"
+    assert statement_type("  update tasks SET title=?") == "UPDATE"
+    assert statement_type("COMMIT") == "OTHER"
+
+
+def test_failed_statement_does_not_skew_later_timings():
+    engine = create_engine("sqlite://")
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    observed = sum(sum(series[:-1]) for series in db_query_duration_seconds.values.values())
+
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.exec_driver_sql("SELECT * FROM missing_table")
+        conn.exec_driver_sql("SELECT 1")
+        assert "query_started" not in conn.connection.info
+
+    assert sum(sum(series[:-1]) for series in db_query_duration_seconds.values.values()) == observed + 1
+    engine.dispose()
@@ -0,0 +1,14 @@
+import pytest
+from app.pagination import encode_cursor, decode_cursor, InvalidCursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({"id": 1234})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == {"id": 1234}
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", encode_cursor({"id": "1"}), encode_cursor({"other": 1})])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
@@ -0,0 +1,19 @@
+import pytest
+from app.search import build_match_query, InvalidSearchQuery
+
+
+def test_terms_are_quoted_and_anded():
+    assert build_match_query("write report") == '"write" "report"'
+
+
+def test_trailing_star_is_a_prefix_query():
+    assert build_match_query("rep* final") == '"rep"* "final"'
+
+
+def test_fts_syntax_is_stripped():
+    assert build_match_query('title:report OR "x" NEAR(a b)') == '"title" "report" "OR" "x" "NEAR" "a" "b"'
+
+
+def test_query_without_terms_is_rejected():
+    with pytest.raises(InvalidSearchQuery):
+        build_match_query('"* - ()')
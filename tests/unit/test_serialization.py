@@ -0,0 +1,79 @@
+import json
+import pytest
+import pytest_asyncio
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from app import serialization, schemas
+from app.crud import task
+from app.models import Base
+from app.models.task import Task, TaskStatus
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Task), [
+            {"title": "Write report", "description": "Quarterly \"numbers\" ✓", "status": TaskStatus.in_progress,
+             "created_at": datetime(2024, 1, 2, 3, 4, 5), "updated_at": datetime(2024, 1, 2, 3, 4, 5)},
+            {"title": "Fix printer", "description": None, "status": TaskStatus.closed,
+             "created_at": datetime(2024, 2, 3, 4, 5, 6), "updated_at": datetime(2024, 3, 4, 5, 6, 7)},
+        ])
+    async with async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoder", ["orjson", None])
+async def test_fast_path_matches_validated_output(db, monkeypatch, encoder):
+    monkeypatch.setattr(serialization, "orjson", pytest.importorskip(encoder) if encoder else None)
+
+    rows = await task.get_tasks(db, as_rows=True)
+    db_tasks = await task.get_tasks(db)
+
+    assert serialization.dump_task_rows(rows) == serialization.dump_tasks(db_tasks)
+
+
+def test_empty_page():
+    assert serialization.dump_task_rows([]) == serialization.dump_tasks([]) == b"[]"
+
+
+@pytest.mark.asyncio
+async def test_change_page_matches_the_schema(db):
+    revision, rows, deleted = await task.get_task_changes(db, 0)
+    db_tasks = await task.get_tasks(db)
+
+    expected = schemas.TaskChanges(revision=revision, changes=db_tasks, deleted=[7, 9])
+    assert serialization.dump_task_changes(revision, rows, [7, 9]) == expected.model_dump_json().encode()
+
+
+def test_negotiate_media_type(monkeypatch):
+    monkeypatch.setattr(serialization, "msgpack", object())
+    monkeypatch.setattr(serialization, "cbor2", object())
+
+    assert serialization.negotiate_media_type(None) == "application/json"
+    assert serialization.negotiate_media_type("*/*") == "application/json"
+    assert serialization.negotiate_media_type("application/msgpack") == "application/msgpack"
+    assert serialization.negotiate_media_type("application/x-msgpack, */*;q=0.1") == "application/msgpack"
+    assert serialization.negotiate_media_type("application/json;q=0.5, application/cbor") == "application/cbor"
+    assert serialization.negotiate_media_type("text/html") == "application/json"
+
+    monkeypatch.setattr(serialization, "cbor2", None)
+    assert serialization.negotiate_media_type("application/cbor") == "application/json"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("module, media_type", [("msgpack", "application/msgpack"), ("cbor2", "application/cbor")])
+async def test_binary_formats_carry_the_json_values(db, module, media_type):
+    codec = pytest.importorskip(module)
+    loads = codec.unpackb if module == "msgpack" else codec.loads
+    rows = await task.get_tasks(db, as_rows=True)
+    expected = json.loads(serialization.dump_task_rows(rows))
+
+    assert loads(serialization.dump_task_rows(rows, media_type)) == expected
+    assert loads(serialization.dump_tasks(await task.get_tasks(db), media_type)) == expected
+    changes = loads(serialization.dump_task_changes(5, rows, [3], media_type))
+    assert changes == {"revision": 5, "changes": expected, "deleted": [3]}
@@ -0,0 +1,37 @@
+from app import serve
+
+
+def test_workers_default_to_cpu_count(monkeypatch):
+    monkeypatch.setattr(serve.os, "cpu_count", lambda: 16)
+
+    assert serve.worker_count(0) == 16
+    assert serve.worker_count(3) == 3
+    assert serve.build_config()["workers"] == 16
+
+
+def test_uses_uvloop_and_httptools_when_installed(monkeypatch):
+    monkeypatch.setattr(serve, "available", lambda module: True)
+
+    config = serve.build_config(workers=2)
+
+    assert config["loop"] == "uvloop"
+    assert config["http"] == "httptools"
+
+
+def test_falls_back_without_optional_packages(monkeypatch):
+    monkeypatch.setattr(serve, "available", lambda module: False)
+
+    config = serve.build_config(workers=2)
+
+    assert config["loop"] == "asyncio"
+    assert config["http"] == "h11"
+
+
+def test_config_is_a_graceful_factory_setup():
+    config = serve.build_config(workers=2, host="127.0.0.1", port=9000)
+
+    assert config["app"] == "app.main:create_app"
+    assert config["factory"] is True
+    assert config["timeout_graceful_shutdown"] > 0
+    assert config["limit_concurrency"] > 0
+    assert (config["host"], config["port"]) == ("127.0.0.1", 9000)
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from app.core.singleflight import SingleFlight
+
+
+class SlowCall:
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_identical_calls_share_one_execution():
+    flight = SingleFlight("test")
+    call = SlowCall(result=["row"])
+    callers = [asyncio.create_task(flight.do("key", call)) for _ in range(5)]
+    other = asyncio.create_task(flight.do("other", SlowCall(result=["other"]).__call__))
+    await asyncio.sleep(0)
+
+    call.release.set()
+    results = await asyncio.gather(*callers)
+
+    assert results == [["row"]] * 5
+    assert call.calls == 1
+    assert flight.stats() == {"in_flight": 1, "leaders": 2, "coalesced": 4}
+    other.cancel()
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    flight = SingleFlight("test")
+    call = SlowCall(error=ValueError("boom"))
+    callers = [asyncio.create_task(flight.do("key", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    call.release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert call.calls == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_over_to_a_follower():
+    flight = SingleFlight("test")
+    call = SlowCall(result="done")
+    leader = asyncio.create_task(flight.do("key", call))
+    follower = asyncio.create_task(flight.do("key", call))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await follower == "done"
+    assert leader.cancelled()
+    assert call.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_forget_starts_a_new_flight():
+    flight = SingleFlight("test")
+    first, second = SlowCall(result="stale"), SlowCall(result="fresh")
+    before = asyncio.create_task(flight.do("key", first))
+    await asyncio.sleep(0)
+
+    flight.forget("key")
+    after = asyncio.create_task(flight.do("key", second))
+    first.release.set()
+    second.release.set()
+
+    assert (await before, await after) == ("stale", "fresh")
+
+
+@pytest.mark.asyncio
+async def test_disabled_runs_every_call():
+    flight = SingleFlight("test", enabled=False)
+    call = SlowCall(result=1)
+    call.release.set()
+
+    assert await asyncio.gather(flight.do("key", call), flight.do("key", call)) == [1, 1]
+    assert call.calls == 2
@@ -0,0 +1,121 @@
+import os
+import subprocess
+import sys
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from app import database
+from app.config import Settings
+from app.main import create_app
+
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+# Generous bound on the time spent in the app's own modules, excluding fastapi/sqlalchemy/pydantic
+APP_MODULES_SELF_TIME_BUDGET_US = 250_000
+
+
+def import_times(statement: str) -> dict[str, tuple[int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, cwd=ROOT_DIR, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        if self_us.isdigit():
+            times[name] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def test_importing_app_main_has_no_side_effects():
+    times = import_times(
+        "import logging, app.main, app.database as d; "
+        "assert d._engines is None and d._sessionmakers is None; "
+        "assert not logging.getLogger().handlers"
+    )
+
+    assert "app.main" in times
+    # The DBAPI driver is only loaded when an engine is created
+    assert "aiosqlite" not in times
+    app_self_us = sum(self_us for name, (self_us, _) in times.items() if name == "app" or name.startswith("app."))
+    assert app_self_us < APP_MODULES_SELF_TIME_BUDGET_US, f"app modules took {app_self_us}us to import"
+
+
+@pytest_asyncio.fixture
+async def configured(tmp_path):
+    database.configure_database(Settings(database_url=f"sqlite+aiosqlite:///{tmp_path / 'startup.db'}"))
+    yield
+    await database.dispose_engines()
+    database.configure_database(Settings())
+
+
+@pytest.mark.asyncio
+async def test_init_db_skips_a_current_schema(configured):
+    await database.init_db()
+    statements = []
+    event.listen(database.engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    await database.init_db()
+
+    assert statements == ["BEGIN IMMEDIATE", "PRAGMA user_version"]
+
+
+def test_concurrent_workers_initialise_the_schema_once(tmp_path):
+    env = os.environ | {"DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'workers.db'}"}
+    script = "import asyncio, app.models.task, app.models.user; from app.database import init_db; asyncio.run(init_db())"
+    workers = [subprocess.Popen([sys.executable, "-c", script], cwd=ROOT_DIR, env=env, stderr=subprocess.PIPE) for _ in range(4)]
+
+    for worker in workers:
+        _, stderr = worker.communicate(timeout=60)
+        assert worker.returncode == 0, stderr.decode()
+
+
+@pytest.mark.asyncio
+async def test_init_db_upgrades_an_old_schema(configured):
+    await database.init_db()
+    async with database.engine.begin() as conn:
+        await conn.exec_driver_sql("PRAGMA user_version = 0")
+        await conn.exec_driver_sql("DROP INDEX ix_tasks_title")
+
+    await database.init_db()
+
+    async with database.engine.begin() as conn:
+        assert await conn.run_sync(database.get_schema_version) == database.SCHEMA_VERSION
+        indexes = await conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")
+        assert "ix_tasks_title" in indexes.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_init_db_stops_reusing_task_ids(configured):
+    async with database.engine.begin() as conn:
+        await conn.exec_driver_sql("CREATE TABLE tasks (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, description VARCHAR, "
+                                   "status VARCHAR(11), created_at DATETIME, updated_at DATETIME)")
+        await conn.exec_driver_sql("INSERT INTO tasks (title, status) VALUES ('Task 1', 'open'), ('Task 2', 'open')")
+
+    await database.init_db()
+
+    async with database.engine.begin() as conn:
+        table_sql = (await conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE name = 'tasks'")).scalar()
+        assert "AUTOINCREMENT" in table_sql
+        await conn.exec_driver_sql("DELETE FROM tasks WHERE id = 2")
+        await conn.exec_driver_sql("INSERT INTO tasks (title, status) VALUES ('Task 3', 'open')")
+        rows = (await conn.exec_driver_sql("SELECT id, title FROM tasks ORDER BY id")).all()
+        matches = (await conn.exec_driver_sql("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'task'")).scalars().all()
+    assert rows == [(1, "Task 1"), (3, "Task 3")]
+    assert sorted(matches) == [1, 3]
+
+
+@pytest.mark.asyncio
+async def test_create_app_configures_the_database_lazily(tmp_path):
+    settings = Settings(database_url=f"sqlite+aiosqlite:///{tmp_path / 'factory.db'}", sqlite_engine_profile="default")
+    app = create_app(settings)
+    try:
+        assert app.state.settings is settings
+        assert database._engines is None
+        assert str(database.engine.url) == settings.database_url
+    finally:
+        await database.dispose_engines()
+        database.configure_database(Settings())
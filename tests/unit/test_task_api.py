@@ -0,0 +1,95 @@
+import httpx
+import pytest
+import pytest_asyncio
+from datetime import datetime
+from fastapi import HTTPException, Request
+from app import database
+from app.api.task import validate_bulk_items, bulk_results, TASK_ID, reject_mixed_lookup, parse_task_ids
+from app.config import TASKS_BULK_MAX_ITEMS, Settings
+from app.core.auth import get_current_user
+from app.main import create_app, lifespan
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+from app.schemas import TaskCreate
+
+
+NOW = datetime(2024, 1, 1)
+
+
+def test_invalid_bulk_items_are_reported_per_item():
+    items = [{"title": "Task 1", "status": "open"}, {"title": "x"}, "junk", {"title": "Task 2", "status": "open"}]
+
+    valid, invalid = validate_bulk_items(items, TaskCreate.model_validate)
+
+    assert list(valid) == [0, 3]
+    assert list(invalid) == [1, 2]
+    db_tasks = [Task(id=task_id, title=f"Task {task_id}", status=TaskStatus.open, created_at=NOW, updated_at=NOW) for task_id in (7, 8)]
+    results = bulk_results(db_tasks, [7, 8], "created", list(valid), invalid)
+    assert [(result.index, result.id, result.status) for result in results] == [
+        (0, 7, "created"), (1, None, "invalid"), (2, None, "invalid"), (3, 8, "created")
+    ]
+    assert "title" in results[1].detail
+
+
+def test_bulk_ids_are_validated_one_by_one():
+    valid, invalid = validate_bulk_items([1, "abc", "3"], TASK_ID.validate_python)
+
+    assert valid == {0: 1, 2: 3}
+    assert list(invalid) == [1]
+
+
+def test_bulk_requests_are_capped():
+    with pytest.raises(HTTPException) as error:
+        validate_bulk_items([1] * (TASKS_BULK_MAX_ITEMS + 1), TASK_ID.validate_python)
+
+    assert error.value.status_code == 400
+
+
+def make_request(query_string: bytes) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/tasks", "query_string": query_string, "headers": []})
+
+
+def test_ids_lookup_rejects_list_parameters():
+    reject_mixed_lookup(make_request(b"ids=1,2"), None)
+
+    for query_string, if_none_match in ((b"ids=1&limit=5", None), (b"ids=1&after=abc", None), (b"ids=1", '"etag"')):
+        with pytest.raises(HTTPException) as error:
+            reject_mixed_lookup(make_request(query_string), if_none_match)
+        assert error.value.status_code == 400
+
+
+def test_parse_task_ids():
+    assert parse_task_ids("3, 1,2,") == [3, 1, 2]
+    for ids in ("", "1,a"):
+        with pytest.raises(HTTPException):
+            parse_task_ids(ids)
+
+
+@pytest_asyncio.fixture
+async def client(tmp_path):
+    app = create_app(Settings(database_url=f"sqlite+aiosqlite:///{tmp_path / 'api.db'}"))
+    app.dependency_overrides[get_current_user] = lambda: User(username="alice")
+    async with lifespan(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    database.configure_database(Settings())
+
+
+@pytest.mark.asyncio
+async def test_compressed_etag_satisfies_if_match(client):
+    body = {"title": "Large task", "description": "x" * 1000, "status": "open"}
+    task_id = (await client.post("/tasks", json=body)).json()["id"]
+
+    response = await client.get(f"/tasks/{task_id}", headers={"Accept-Encoding": "gzip"})
+    etag = response.headers["etag"]
+    assert response.headers["content-encoding"] == "gzip"
+    assert etag.endswith('-gzip"') and not etag.startswith("W/")
+    not_modified = await client.get(f"/tasks/{task_id}", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert not_modified.status_code == 304
+
+    updated = await client.put(f"/tasks/{task_id}", json=body | {"status": "closed"}, headers={"If-Match": etag})
+    assert updated.status_code == 200
+    assert updated.json()["status"] == "closed"
+
+    stale = await client.put(f"/tasks/{task_id}", json=body, headers={"If-Match": etag})
+    assert stale.status_code == 412
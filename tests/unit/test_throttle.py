@@ -0,0 +1,56 @@
+import pytest
+from app.core.throttle import TokenBucketLimiter, LatencyAverage
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.throttle.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_allows_burst_then_rejects(clock):
+    limiter = TokenBucketLimiter(capacity=3, refill_per_second=0.5)
+
+    assert [limiter.acquire("alice") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("alice") == pytest.approx(2.0)
+    assert limiter.stats() == {"keys": 1, "allowed": 3, "rejected": 1}
+
+
+def test_bucket_refills_over_time(clock):
+    limiter = TokenBucketLimiter(capacity=2, refill_per_second=1)
+    limiter.acquire("alice")
+    limiter.acquire("alice")
+
+    clock[0] += 0.5
+    assert limiter.acquire("alice") == pytest.approx(0.5)
+    clock[0] += 0.5
+    assert limiter.acquire("alice") == 0.0
+
+
+def test_keys_are_independent(clock):
+    limiter = TokenBucketLimiter(capacity=1, refill_per_second=1)
+
+    assert limiter.acquire("alice") == 0.0
+    assert limiter.acquire("bob") == 0.0
+    assert limiter.acquire("alice") > 0
+
+
+def test_least_recently_seen_keys_are_evicted(clock):
+    limiter = TokenBucketLimiter(capacity=1, refill_per_second=1, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.acquire(key)
+
+    assert len(limiter) == 2
+    # "a" was evicted, so it starts again from a full bucket
+    assert limiter.acquire("a") == 0.0
+
+
+def test_latency_average():
+    average = LatencyAverage(initial=0.25, weight=0.5)
+    assert average.value == 0.25
+
+    average.observe(0.1)
+    assert average.value == pytest.approx(0.1)
+    average.observe(0.3)
+    assert average.value == pytest.approx(0.2)
@@ -1,5 +1,6 @@
-
-from app.utils import hash_password, verify_password
+import asyncio
+import pytest
+from app.utils import hash_password, verify_password, run_in_hash_pool, hash_pool_stats, HashPoolSaturated
 
 
 def test_hash_password():
@@ -23,3 +24,43 @@ def test_empty_password():
     assert hashed != password
     assert verify_password(password, hashed)
 
+
+
+@pytest.mark.asyncio
+async def test_run_in_hash_pool():
+    calls_before = hash_pool_stats["calls"]
+    hashed = await run_in_hash_pool(hash_password, "pooledpassword")
+
+    assert await run_in_hash_pool(verify_password, "pooledpassword", hashed)
+    assert hash_pool_stats["calls"] == calls_before + 2
+    assert hash_pool_stats["in_flight"] == 0
+    assert hash_pool_stats["queue_time_max"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_run_in_hash_pool_does_not_block_event_loop():
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker_task = asyncio.create_task(ticker())
+    await run_in_hash_pool(hash_password, "slowpassword")
+    ticker_task.cancel()
+
+    assert ticks > 1
+
+
+@pytest.mark.asyncio
+async def test_run_in_hash_pool_rejects_when_saturated(monkeypatch):
+    monkeypatch.setattr("app.utils.PASSWORD_HASH_MAX_IN_FLIGHT", 0)
+    rejected_before = hash_pool_stats["rejected"]
+
+    with pytest.raises(HashPoolSaturated):
+        await run_in_hash_pool(hash_password, "rejectedpassword")
+
+    assert hash_pool_stats["rejected"] == rejected_before + 1
+    assert hash_pool_stats["in_flight"] == 0
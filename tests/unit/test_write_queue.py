@@ -0,0 +1,40 @@
+import asyncio
+import pytest
+from app.core.write_queue import GroupCommitQueue
+from app.crud.task import _create_task
+from app.models.task import TaskStatus
+from app.schemas import TaskCreate
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_commits(session_factory):
+    queue = GroupCommitQueue(session_factory, max_batch=64, window_ms=20)
+
+    created = await asyncio.gather(*[
+        queue.submit(_create_task, TaskCreate(title=f"Task {i}", status=TaskStatus.open)) for i in range(20)
+    ])
+    await queue.stop()
+
+    assert [db_task.title for db_task in created] == [f"Task {i}" for i in range(20)]
+    assert len({db_task.id for db_task in created}) == 20
+    assert queue.operations == 20
+    assert queue.batches < 20
+
+
+@pytest.mark.asyncio
+async def test_failing_write_does_not_fail_batch(session_factory):
+    queue = GroupCommitQueue(session_factory, max_batch=64, window_ms=20)
+
+    async def failing_operation(db):
+        raise RuntimeError("bad write")
+
+    results = await asyncio.gather(
+        queue.submit(_create_task, TaskCreate(title="Task ok", status=TaskStatus.open)),
+        queue.submit(failing_operation),
+        return_exceptions=True
+    )
+    await queue.stop()
+
+    assert results[0].title == "Task ok"
+    assert isinstance(results[1], RuntimeError)
+    assert queue.fallbacks == 1